@@ -1,16 +1,24 @@
 # app/api/v1/analytics.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_async_db
+from app.schemas.analytics import AnalyticsResponse
+from app.services.analytics_services import AnalyticsService
+from loguru import logger
 
 router = APIRouter()
 
-@router.get("/analytics")
-async def get_analytics():
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    window: str = Query("7d", pattern="^(24h|7d|30d|90d|all)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Returns system analytics for admin dashboard.
-    TODO: fetch from analytics_service.py + database.
+    Returns system analytics for admin dashboard, read from the hourly/daily
+    rollup tables.
     """
-    return {
-        "total_predictions": 120,
-        "most_common_label": "plastic",
-        "accuracy": 0.87,
-    }
+    try:
+        return await AnalyticsService(db).summary(window)
+    except Exception as e:
+        logger.error(f"Analytics error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute analytics")
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, PasswordResetRequest, PasswordReset
-from app.utils.auth_utils import create_access_token, verify_password, hash_password
+from app.utils.auth_utils import create_access_token
+from app.core.exception import ServiceUnavailableException
+from app.services.password_hasher import hasher as password_hasher, PasswordHasherBusyError
+from app.services.auth_cache import token_cache, user_cache
 from app.utils.email import send_password_reset_email, send_welcome_email
-from app.database.session import get_db
+from app.database.session import get_async_db
 from app.models.user import User
 from app.config import get_settings
 
@@ -16,26 +20,38 @@ router = APIRouter(tags=["Authentication"])
 
 # ✅ Signup
 @router.post("/signup", response_model=UserResponse)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusyError as e:
+        raise ServiceUnavailableException("Too many sign-ups right now, retry shortly", e.retry_after)
     new_user = User(username=user.name, email=user.email, password_hash=hashed_password)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     token = create_access_token({"sub": new_user.email})
     return {"id": new_user.id, "username": new_user.username, "email": new_user.email, "token": token}
 
 # ✅ Login
 @router.post("/login", response_model=UserResponse)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password_hash):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == user.email))
+    if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(user.password, db_user.password_hash)
+    except PasswordHasherBusyError as e:
+        raise ServiceUnavailableException("Too many logins right now, retry shortly", e.retry_after)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Argon2 parameters changed since this hash was made
+        db_user.password_hash = new_hash
+        await db.commit()
 
     token = create_access_token({"sub": db_user.email})
     return {"id": db_user.id, "username": db_user.username, "email": db_user.email, "token": token}
@@ -43,8 +59,8 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/forgot-password")
-async def forgot_password(request: PasswordResetRequest, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == request.email).first()
+async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == request.email))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -56,19 +72,38 @@ async def forgot_password(request: PasswordResetRequest, db: Session = Depends(g
 
 
 @router.post("/reset-password")
-def reset_password(data: PasswordReset, db: Session = Depends(get_db)):
+async def reset_password(data: PasswordReset, db: AsyncSession = Depends(get_async_db)):
     try:
         payload = jwt.decode(data.token, settings.SECRET_KEY, algorithms=["HS256"])
         email: str = payload.get("sub")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    db_user = db.query(User).filter(User.email == email).first()
+    db_user = await db.scalar(select(User).where(User.email == email))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db_user.password_hash = hash_password(data.new_password)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        db_user.password_hash = await password_hasher.hash(data.new_password)
+    except PasswordHasherBusyError as e:
+        raise ServiceUnavailableException("Too many requests right now, retry shortly", e.retry_after)
+    await db.commit()
+    user_cache.invalidate(user_id=db_user.id, email=db_user.email)
 
     return {"message": "Password reset successfully"}
+
+
+@router.get("/hash-stats")
+async def hash_stats():
+    """
+    Password hashing pool usage and hash/verify latency.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/cache/stats")
+async def auth_cache_stats():
+    """
+    Verified-token and user lookup cache usage.
+    """
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
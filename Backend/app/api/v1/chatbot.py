@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Body
-from app.services.chatbot_service import get_chatbot_response
+from app.services.chatbot_service import get_chatbot_response, chatbot
 
 router = APIRouter()
 
@@ -8,8 +8,16 @@ async def chat(message: str = Body(..., embed=True)):
     """
     Chatbot endpoint powered by Gemini API.
     """
-    bot_reply = get_chatbot_response(message)
+    bot_reply = await get_chatbot_response(message)
     return {
         "user_message": message,
         "bot_reply": bot_reply
     }
+
+
+@router.get("/chat/stats")
+async def chat_stats():
+    """
+    Chatbot cache, coalescing and timeout counters.
+    """
+    return chatbot.stats()
@@ -1,26 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.feedback import FeedbackRequest, FeedbackResponse
-from app.services.feedback_service import save_feedback, get_all_feedback
-from app.database.session import get_db
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.config import get_settings
+from app.schemas.feedback import FeedbackRequest, FeedbackResponse, FeedbackBulkRequest, FeedbackBulkResponse
+from app.services.feedback_service import (
+    EXPORT_MEDIA_TYPES,
+    get_all_feedback,
+    parquet_available,
+    save_feedback,
+    save_feedback_bulk,
+    stream_feedback,
+)
+from app.database.session import get_async_db
+
+settings = get_settings()
 
 router = APIRouter()
 
 @router.post("/feedback", response_model=FeedbackResponse)
-async def submit_feedback(feedback: FeedbackRequest, db: Session = Depends(get_db)):
+async def submit_feedback(feedback: FeedbackRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Submit feedback for a prediction (correct label vs predicted label).
     """
-    return save_feedback(db, feedback)
+    return await save_feedback(db, feedback)
+
+@router.post("/feedback/bulk", response_model=FeedbackBulkResponse)
+async def submit_feedback_bulk(data: FeedbackBulkRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Submit many feedback records in one request (single batched insert).
+    """
+    if len(data.items) > settings.FEEDBACK_BULK_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.FEEDBACK_BULK_MAX} records per request",
+        )
+    try:
+        inserted = await save_feedback_bulk(db, data.items)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to store feedback: {e}")
+    return FeedbackBulkResponse(status="success", inserted=inserted)
 
 @router.get("/feedback", response_model=List[FeedbackResponse])
-async def list_feedback(db: Session = Depends(get_db)):
+async def list_feedback(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all feedback entries.
+    Get one page of feedback entries (newest first).
     """
     try:
-        feedback_entries = get_all_feedback(db)
+        feedback_entries = await get_all_feedback(db, limit=limit, offset=offset)
         return [
             FeedbackResponse(
                 status="success",
@@ -32,3 +65,22 @@ async def list_feedback(db: Session = Depends(get_db)):
         ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch feedback: {e}")
+
+@router.get("/feedback/export")
+async def export_feedback(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    since: Optional[datetime] = Query(None, description="created_at >= since"),
+    until: Optional[datetime] = Query(None, description="created_at < until"),
+):
+    """
+    Stream all feedback in a created_at range for retraining, in created_at
+    order. For the next increment pass the last row's created_at as `since`
+    (rows at exactly that time come again; dedupe by id).
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed")
+    return StreamingResponse(
+        stream_feedback(format, since, until, settings.FEEDBACK_EXPORT_CHUNK),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="feedback.{format}"'},
+    )
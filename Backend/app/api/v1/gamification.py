@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_async_db
 from app.services.gamification_service import GamificationService
+from app.services.leaderboard_cache import cache as leaderboard_cache
+from app.services.score_buffer import buffer as score_buffer
 from app.schemas.gamification import LeaderboardResponse, UserStats, AnalysisRequest, LeaderboardUpdateRequest
 import logging
 
@@ -9,62 +12,128 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # -------------------- LEADERBOARD --------------------
+async def _cached_page(cache_key: str, response: Response, if_none_match: Optional[str], compute):
+    """
+    Serve a leaderboard page from the cache (computing it on a miss), with
+    an ETag; answers 304 when the client already has this version.
+    """
+    cached, generation = leaderboard_cache.get(cache_key)
+    if cached is None:
+        payload = await compute()
+        if payload is None:
+            return None
+        etag = leaderboard_cache.put(cache_key, payload, generation)
+    else:
+        etag, payload = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return payload
+
+@router.get("/leaderboard/cache/stats")
+async def get_leaderboard_cache_stats():
+    return leaderboard_cache.stats()
+
+@router.get("/leaderboard/buffer/stats")
+async def get_score_buffer_stats():
+    return score_buffer.stats()
+
 @router.get("/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(db: Session = Depends(get_db)):
+async def get_leaderboard(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
     service = GamificationService(db)
     try:
-        return service.get_leaderboard()
+        return await _cached_page(
+            f"page:{limit}:{offset}:{cursor or ''}",
+            response,
+            if_none_match,
+            lambda: service.get_leaderboard(limit=limit, offset=offset, cursor=cursor),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Leaderboard error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch leaderboard")
 
+@router.get("/leaderboard/around/{user_id}", response_model=LeaderboardResponse)
+async def get_leaderboard_window(
+    response: Response,
+    user_id: int,
+    size: int = Query(5, ge=0, le=50),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    service = GamificationService(db)
+    try:
+        window = await _cached_page(
+            f"around:{user_id}:{size}",
+            response,
+            if_none_match,
+            lambda: service.get_leaderboard_window(user_id, size=size),
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Leaderboard window error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch leaderboard")
+    if window is None:
+        raise HTTPException(status_code=404, detail="User has no leaderboard entry")
+    return window
+
 @router.post("/leaderboard")
-def update_leaderboard(data: LeaderboardUpdateRequest, db: Session = Depends(get_db)):
+async def update_leaderboard(data: LeaderboardUpdateRequest, db: AsyncSession = Depends(get_async_db)):
     service = GamificationService(db)
     try:
-        return service.update_leaderboard(
+        return await service.update_leaderboard(
             user_id=data.user_id,
             score=data.score,
             items_analyzed=data.items_analyzed,
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Leaderboard update error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update leaderboard")
 
 @router.put("/leaderboard")
-def update_leaderboard_stats(data: LeaderboardUpdateRequest, db: Session = Depends(get_db)):
+async def update_leaderboard_stats(data: LeaderboardUpdateRequest, db: AsyncSession = Depends(get_async_db)):
     service = GamificationService(db)
     try:
-        return service.update_leaderboard(
+        return await service.update_leaderboard(
             user_id=data.user_id,
             score=data.score,
             items_analyzed=data.items_analyzed
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Leaderboard update error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update leaderboard")
 
 # -------------------- ANALYSIS --------------------
 @router.post("/leaderboard/analysis")
-def record_analysis(data: AnalysisRequest, db: Session = Depends(get_db)):
+async def record_analysis(data: AnalysisRequest, db: AsyncSession = Depends(get_async_db)):
     service = GamificationService(db)
     try:
-        return service.add_analysis_points(user_id=data.user_id)
+        return await service.add_analysis_points(user_id=data.user_id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Analysis points error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # -------------------- USER STATS --------------------
 @router.get("/user/{user_id}/stats", response_model=UserStats)
-def get_user_stats(user_id: int, db: Session = Depends(get_db)):
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_db)):
     service = GamificationService(db)
     try:
-        return service.get_user_stats(user_id)
+        return await service.get_user_stats(user_id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"User stats error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch user stats")
@@ -1,48 +1,117 @@
 import os
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+import time
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, File, Query, UploadFile, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from app.config import get_settings
-from app.utils.file_utils import save_upload
+from app.utils.file_utils import save_upload, write_upload
+from app.core.exception import ServiceUnavailableException
+from app.core.security import get_optional_user
+from app.schemas.auth import UserResponse
 from app.services import yolo_service
+from app.services.prediction_cache import cache as prediction_cache
+from app.services.inference_executor import executor as inference_executor, InferenceSaturatedError
+from app.services.prediction_log import writer as prediction_log
+from app.services.tts_service import disposal_instruction
+from loguru import logger
 
 router = APIRouter()
 settings = get_settings()
 
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png"]
+VIDEO_EXTENSIONS = [".mp4", ".avi", ".mov"]
+
 
 @router.post("/predict")
-async def predict(file: UploadFile = File(...)):
+async def predict(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    detail: bool = Query(False, description="Include per-frame detections and bbox track for videos"),
+    user: Optional[UserResponse] = Depends(get_optional_user),
+):
     """
     Upload an image or video for YOLOv12 classification.
     Supports .jpg, .jpeg, .png, .mp4
+    Images are decoded in memory (PREDICT_IN_MEMORY); the original is
+    persisted to static/uploads after the response when PERSIST_UPLOADS is set.
+    Every prediction is queued to the prediction log (never blocks), under
+    the caller's user id when a valid bearer token is sent.
     """
+    started = time.perf_counter()
+    content_hash = None
     try:
-        # Save file to static/uploads
         upload_dir = settings.UPLOAD_DIR
-        os.makedirs(upload_dir, exist_ok=True)
-        saved_path = save_upload(file, upload_dir)
+        ext = os.path.splitext(file.filename or "")[-1].lower()
 
         # Decide if image or video
-        ext = os.path.splitext(saved_path)[-1].lower()
-        if ext in [".jpg", ".jpeg", ".png"]:
-            result = yolo_service.predict_image(saved_path)
-        elif ext in [".mp4", ".avi", ".mov"]:
-            result = yolo_service.predict_video(saved_path)
+        if ext in IMAGE_EXTENSIONS:
+            data = await file.read()
+            # Identical uploads (retries, double taps) are answered from the cache
+            content_hash, result = await run_in_threadpool(prediction_cache.lookup, data)
+            if result is None:
+                if settings.PREDICT_IN_MEMORY:
+                    result = await inference_executor.run(yolo_service.predict_image_bytes, data)
+                else:
+                    saved_path = await run_in_threadpool(write_upload, data, upload_dir, ext, content_hash)
+                    result = await inference_executor.run(yolo_service.predict_image, saved_path)
+                prediction_cache.put(content_hash, result)
+                background_tasks.add_task(prediction_cache.persist, content_hash, result)
+            if settings.PREDICT_IN_MEMORY and settings.PERSIST_UPLOADS:
+                # Named by content hash, so duplicates are stored once
+                background_tasks.add_task(write_upload, data, upload_dir, ext, content_hash)
+        elif ext in VIDEO_EXTENSIONS:
+            # OpenCV needs a file to read video containers from
+            saved_path = await run_in_threadpool(save_upload, file, upload_dir)
+            result = await inference_executor.run(yolo_service.predict_video, saved_path, detail=detail)
         else:
             raise HTTPException(status_code=400, detail="Unsupported file type")
 
-
- # 👇 Add debug print here
-        print(f"\n[DEBUG] Processed file: {file.filename}")
-        print(f"[DEBUG] Prediction result: {result}\n")
-
-        return JSONResponse(
-            content={
-                "filename": file.filename,
-                "label": result["label"],
-                "confidence": result["confidence"],
-                "bboxes": result.get("bboxes", []),
-                "instructions": f"Dispose in the {result['label']} recycling bin."
-            }
+        latency_ms = (time.perf_counter() - started) * 1000
+        logger.debug(f"Predicted {file.filename}: {result['label']} ({result['confidence']:.2f}) in {latency_ms:.0f}ms")
+        prediction_log.log(
+            source="image" if ext in IMAGE_EXTENSIONS else "video",
+            label=result["label"],
+            confidence=result["confidence"],
+            bboxes=result.get("bboxes", []),
+            latency_ms=latency_ms,
+            model_version=yolo_service.model_version(),
+            content_hash=content_hash,
+            user_id=user.id if user else None,
         )
+
+        content = {
+            "filename": file.filename,
+            "label": result["label"],
+            "confidence": result["confidence"],
+            "bboxes": result.get("bboxes", []),
+            "instructions": disposal_instruction(result["label"])
+        }
+        if detail:
+            for key in ("frames_analyzed", "stop_reason", "frames", "track"):
+                if key in result:
+                    content[key] = result[key]
+        return JSONResponse(content=content)
+    except InferenceSaturatedError as e:
+        raise ServiceUnavailableException("Inference workers are busy, retry shortly", e.retry_after)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
+
+@router.get("/predict/stats")
+async def predict_stats():
+    """
+    Inference executor, batching, prediction cache, near-duplicate and
+    prediction log statistics.
+    """
+    return {
+        "executor": inference_executor.stats(),
+        "batching": yolo_service.get_batching_stats(),
+        "cache": prediction_cache.stats(),
+        "near_duplicate": yolo_service.get_near_duplicate_stats(),
+        "prediction_log": prediction_log.stats(),
+    }
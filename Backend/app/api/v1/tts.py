@@ -1,19 +1,52 @@
-from fastapi import APIRouter, Body, HTTPException
-from app.services.tts_service import generate_tts
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.tts_service import generate_tts_async, stream_tts, cache as tts_cache, provider as tts_provider
 
 router = APIRouter()
 
+
+async def _stream_response(text: str, lang: str) -> StreamingResponse:
+    try:
+        media_type, chunks = await stream_tts(text, lang)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"TTS generation failed: {e}")
+    return StreamingResponse(chunks, media_type=media_type)
+
+
 @router.post("/tts")
-async def generate_tts_api(text: str = Body(..., embed=True)):
+async def generate_tts_api(
+    text: str = Body(..., embed=True),
+    lang: str = Body("en", embed=True),
+    stream: bool = Body(False, embed=True),
+):
     """
-    Convert text into speech (mp3).
-    Returns URL of generated audio file.
+    Convert text into speech.
+    Returns URL of generated audio file; text spoken before reuses its file.
+    With `stream`, the audio itself is streamed back as it is synthesized.
     """
+    if stream:
+        return await _stream_response(text, lang)
     try:
-        audio_url = generate_tts(text)
+        audio_url = await generate_tts_async(text, lang)
         return {
             "text": text,
             "audio_url": audio_url
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS generation failed: {e}")
+
+
+@router.get("/tts/stream")
+async def stream_tts_api(text: str = Query(..., min_length=1), lang: str = Query("en")):
+    """
+    Streamed speech for `text`, usable directly as an <audio> source.
+    """
+    return await _stream_response(text, lang)
+
+
+@router.get("/tts/cache/stats")
+async def tts_cache_stats():
+    """
+    TTS audio cache hit rate and disk usage.
+    """
+    return {"provider": tts_provider.name, **tts_cache.stats()}
@@ -18,6 +18,13 @@ class Settings(BaseSettings):
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_NAME: str = os.getenv("DB_NAME", "ecosort_db")
     DB_PORT: int = int(os.getenv("DB_PORT", 3306))
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))  # below MySQL wait_timeout
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
 
     @property
     def DATABASE_URL(self) -> str:
@@ -29,26 +36,118 @@ class Settings(BaseSettings):
                 return f"mysql+pymysql://{self.DB_USER}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         return "sqlite:///./app.db"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Same database through an asyncio driver (aiomysql / aiosqlite)."""
+        url = self.DATABASE_URL
+        if url.startswith("mysql+pymysql://"):
+            return url.replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
     # YOLO
     YOLO_MODEL_PATH: str = os.getenv("YOLO_MODEL_PATH", "./app/Trained_model/best_model.pt")
+    YOLO_BACKEND: str = os.getenv("YOLO_BACKEND", "torch")  # torch | onnx | openvino
+    YOLO_ONNX_PATH: str = os.getenv("YOLO_ONNX_PATH", "")  # default: next to YOLO_MODEL_PATH
+    YOLO_OPENVINO_PATH: str = os.getenv("YOLO_OPENVINO_PATH", "")
+    YOLO_INT8: bool = os.getenv("YOLO_INT8", "false").lower() == "true"
+    YOLO_IMGSZ: int = int(os.getenv("YOLO_IMGSZ", 640))
     YOLO_CONFIDENCE_THRESHOLD: float = float(os.getenv("YOLO_CONFIDENCE_THRESHOLD", 0.5))
     YOLO_IOU_THRESHOLD: float = float(os.getenv("YOLO_IOU_THRESHOLD", 0.45))
+    PREDICT_IN_MEMORY: bool = os.getenv("PREDICT_IN_MEMORY", "true").lower() == "true"
+    PERSIST_UPLOADS: bool = os.getenv("PERSIST_UPLOADS", "true").lower() == "true"
+    YOLO_BATCHING_ENABLED: bool = os.getenv("YOLO_BATCHING_ENABLED", "true").lower() == "true"
+    YOLO_BATCH_MAX_SIZE: int = int(os.getenv("YOLO_BATCH_MAX_SIZE", 8))
+    YOLO_BATCH_MAX_WAIT_MS: float = float(os.getenv("YOLO_BATCH_MAX_WAIT_MS", 10))
+    YOLO_VIDEO_BATCH_SIZE: int = int(os.getenv("YOLO_VIDEO_BATCH_SIZE", 8))
+    YOLO_WARMUP_SHAPES: str = os.getenv("YOLO_WARMUP_SHAPES", "640x480,1280x720")  # width x height
+
+    # Video consensus (early exit once the majority label is stable)
+    VIDEO_ADAPTIVE: bool = os.getenv("VIDEO_ADAPTIVE", "true").lower() == "true"
+    VIDEO_MIN_FRAMES: int = int(os.getenv("VIDEO_MIN_FRAMES", 3))
+    VIDEO_CONSENSUS_CONFIDENCE: float = float(os.getenv("VIDEO_CONSENSUS_CONFIDENCE", 0.95))
+    VIDEO_CONSENSUS_MARGIN: float = float(os.getenv("VIDEO_CONSENSUS_MARGIN", 0.0))
+    VIDEO_TIME_BUDGET_S: float = float(os.getenv("VIDEO_TIME_BUDGET_S", 10.0))  # 0 = no limit
+
+    # Prediction cache (content hash of the upload -> result)
+    PREDICTION_CACHE_ENABLED: bool = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+    PREDICTION_CACHE_MAX_ENTRIES: int = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", 2048))
+    PREDICTION_CACHE_DIR: str = os.getenv("PREDICTION_CACHE_DIR", "")  # empty = memory only
+    PREDICTION_CACHE_DISK_MAX_MB: int = int(os.getenv("PREDICTION_CACHE_DISK_MAX_MB", 256))
+
+    # Near-duplicate lookup (perceptual hash, Hamming distance in bits)
+    NEAR_DUP_ENABLED: bool = os.getenv("NEAR_DUP_ENABLED", "false").lower() == "true"
+    NEAR_DUP_THRESHOLD: int = int(os.getenv("NEAR_DUP_THRESHOLD", 5))
+    NEAR_DUP_MAX_ENTRIES: int = int(os.getenv("NEAR_DUP_MAX_ENTRIES", 10000))
+
+    # Inference executor
+    INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread")  # thread | process
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", 8))
+    INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", 32))
+    INFERENCE_RETRY_AFTER: int = int(os.getenv("INFERENCE_RETRY_AFTER", 2))
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
 
     # Gemini API
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
 
+    # Chatbot
+    CHATBOT_PROVIDER: str = os.getenv("CHATBOT_PROVIDER", "gemini")  # gemini | stub (offline)
+    CHATBOT_TIMEOUT: float = float(os.getenv("CHATBOT_TIMEOUT", 20))
+    CHATBOT_MAX_CONCURRENCY: int = int(os.getenv("CHATBOT_MAX_CONCURRENCY", 4))
+    CHATBOT_CACHE_TTL: float = float(os.getenv("CHATBOT_CACHE_TTL", 3600))
+    CHATBOT_CACHE_SIZE: int = int(os.getenv("CHATBOT_CACHE_SIZE", 1000))
+
     # TTS
-    TTS_PROVIDER: str = os.getenv("TTS_PROVIDER", "gtts")
+    TTS_PROVIDER: str = os.getenv("TTS_PROVIDER", "gtts")  # gtts | espeak | pyttsx3 (offline)
     TTS_AUDIO_DIR: str = os.getenv("TTS_AUDIO_DIR", "./app/static/audio")
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", 256))
+    TTS_CACHE_MAX_AGE_DAYS: float = float(os.getenv("TTS_CACHE_MAX_AGE_DAYS", 30))  # since last use; 0 keeps forever
+    TTS_WORKERS: int = int(os.getenv("TTS_WORKERS", 2))
+    TTS_TIMEOUT: float = float(os.getenv("TTS_TIMEOUT", 30))
+    TTS_STREAM_CHUNK_BYTES: int = int(os.getenv("TTS_STREAM_CHUNK_BYTES", 8192))
+    ESPEAK_BINARY: str = os.getenv("ESPEAK_BINARY", "")
 
     # Gamification
     ALLOWED_EXTENSIONS: str = os.getenv("ALLOWED_EXTENSIONS", "jpg,jpeg,png,mp4")
     POINTS_PER_CORRECT: int = int(os.getenv("POINTS_PER_CORRECT", 10))
     BADGE_THRESHOLDS: str = os.getenv("BADGE_THRESHOLDS", "50,100,200")
+    LEADERBOARD_CACHE_BACKEND: str = os.getenv("LEADERBOARD_CACHE_BACKEND", "memory")  # memory | redis | none
+    LEADERBOARD_CACHE_TTL: float = float(os.getenv("LEADERBOARD_CACHE_TTL", 15))
+    LEADERBOARD_CACHE_MAX_ENTRIES: int = int(os.getenv("LEADERBOARD_CACHE_MAX_ENTRIES", 2048))  # memory backend
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    SCORE_BUFFER_ENABLED: bool = os.getenv("SCORE_BUFFER_ENABLED", "false").lower() == "true"
+    SCORE_BUFFER_FLUSH_INTERVAL: float = float(os.getenv("SCORE_BUFFER_FLUSH_INTERVAL", 2.0))
+    SCORE_BUFFER_FLUSH_SIZE: int = int(os.getenv("SCORE_BUFFER_FLUSH_SIZE", 500))
+    SCORE_BUFFER_LOG: str = os.getenv("SCORE_BUFFER_LOG", "")  # JSONL event log, empty = memory only
+    SCORE_BUFFER_FSYNC: bool = os.getenv("SCORE_BUFFER_FSYNC", "false").lower() == "true"
+
+    # Prediction log (non-blocking event log feeding analytics)
+    PREDICTION_LOG_SINK: str = os.getenv("PREDICTION_LOG_SINK", "db")  # db | file | none
+    PREDICTION_LOG_DIR: str = os.getenv("PREDICTION_LOG_DIR", "./logs/predictions")
+    PREDICTION_LOG_MAX_QUEUE: int = int(os.getenv("PREDICTION_LOG_MAX_QUEUE", 10000))
+    PREDICTION_LOG_BATCH_SIZE: int = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", 200))
+    PREDICTION_LOG_FLUSH_INTERVAL: float = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", 1.0))
+    PREDICTION_LOG_ROTATE_MB: int = int(os.getenv("PREDICTION_LOG_ROTATE_MB", 64))
+    PREDICTION_LOG_BACKUPS: int = int(os.getenv("PREDICTION_LOG_BACKUPS", 20))
+
+    # Feedback
+    FEEDBACK_BULK_MAX: int = int(os.getenv("FEEDBACK_BULK_MAX", 5000))  # records per bulk request
+    FEEDBACK_EXPORT_CHUNK: int = int(os.getenv("FEEDBACK_EXPORT_CHUNK", 1000))  # rows per fetch while exporting
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "changeme")
+    # Argon2 parameters; hashes made with older values are upgraded on login
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", 3))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", 65536))  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", 4))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5.0))
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 2))
+    # Verified-token LRU and short-lived user lookups for the auth dependency
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", 30))
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", 10000))
 
     # Paths
     BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
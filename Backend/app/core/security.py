@@ -1,54 +1,80 @@
-from passlib.context import CryptContext
+from datetime import timedelta
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from app.app.config import settings
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database.session import get_db
-from Backend.app.schemas.auth import TokenData
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.database.session import get_async_db
+from app.models.user import User
+from app.schemas.auth import UserResponse
+from app.services.auth_cache import token_cache, user_cache
+from app.utils import auth_utils
+from app.utils.auth_utils import verify_password, hash_password as get_password_hash
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login")
+settings = get_settings()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    seconds = int(expires_delta.total_seconds()) if expires_delta else None
+    return auth_utils.create_access_token(data, expires_delta=seconds)
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verified payload of `token`, or None. Verified tokens are cached until
+    they expire, so repeat requests skip the signature check.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    try:
+        payload = jwt.decode(token, auth_utils.SECRET_KEY, algorithms=[auth_utils.ALGORITHM])
+    except JWTError:
+        return None
+    token_cache.put(token, payload)
+    return payload
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db),
+) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+    payload = verify_token(token)
+    email = payload.get("sub") if payload else None
+    if email is None:
         raise credentials_exception
-    
-    # Import UserService here to avoid circular imports
-    from app.services.user_service import UserService
-    user_service = UserService()
-    user = await user_service.get_user_by_username(db, username=token_data.username)
+
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        db_user = await db.scalar(select(User).where(User.email == email))
+        if db_user is None or db_user.is_active is False:
+            raise credentials_exception
+        user = UserResponse(id=db_user.id, username=db_user.username, email=db_user.email)
+        user_cache.put(user)
+    return user.model_copy(update={"token": token})
+
+
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[UserResponse]:
+    """
+    The authenticated user for endpoints that also serve anonymous callers;
+    None without a token or with one that does not verify.
+    """
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
@@ -0,0 +1,127 @@
+# app/database/engine.py
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class PoolMetrics:
+    """
+    Checkout counters for one connection pool: how often callers had to wait
+    for a connection, for how long, and how many gave up (pool timeout).
+    """
+
+    # Checkouts slower than this count as having waited for a connection
+    WAIT_THRESHOLD_S = 0.001
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+            if seconds >= self.WAIT_THRESHOLD_S:
+                self._waits += 1
+                self._wait_total += seconds
+                self._wait_max = max(self._wait_max, seconds)
+
+    def stats(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": self._wait_total * 1000 / self._waits if self._waits else 0.0,
+                "max_wait_ms": self._wait_max * 1000,
+                "timeouts": self._timeouts,
+            }
+
+
+def _timed_pool_class(base, metrics: PoolMetrics):
+    """
+    Subclass of a queue pool that times every checkout. A subclass (rather
+    than an attribute on the instance) survives pool.recreate().
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except Exception:
+            metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record(time.perf_counter() - started)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get, "metrics": metrics})
+
+
+def _set_sqlite_pragmas(dbapi_connection, _record):
+    # WAL lets readers run alongside the single writer; NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def create_db_engine(url: str, asynchronous: bool = False):
+    """
+    The one place engines are built: pool sizing, recycle and pre-ping come
+    from Settings, checkouts are timed into `engine.pool.metrics`, and SQLite
+    connections get WAL pragmas.
+    """
+    is_sqlite = url.startswith("sqlite")
+    base_pool = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    metrics = PoolMetrics("async" if asynchronous else "sync")
+    kwargs = {
+        "echo": settings.DB_ECHO,
+        "poolclass": _timed_pool_class(base_pool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if is_sqlite and not asynchronous:
+        kwargs["connect_args"] = {"check_same_thread": False}
+
+    if asynchronous:
+        engine = create_async_engine(url, **kwargs)
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(url, **kwargs)
+
+    if is_sqlite:
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    pool = engine.pool
+    return pool.metrics.stats(pool)
+
+
+def describe_pool(engine) -> str:
+    pool = engine.pool
+    return (
+        f"{engine.url.render_as_string(hide_password=True)} "
+        f"pool={type(pool).__name__} size={pool.size()} max_overflow={pool._max_overflow} "
+        f"timeout={pool._timeout}s recycle={pool._recycle}s pre_ping={pool._pre_ping}"
+    )
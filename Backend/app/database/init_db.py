@@ -1,12 +1,17 @@
-from app.config import Base, engine
+from app.database.session import Base, engine
 from app.models.user import User
 from app.models.feedback_m import Feedback
 from app.models.leaderboard import Leaderboard
+from app.models.analytics import PredictionLog, PredictionRollup, FeedbackRollup
 from loguru import logger
 
 def init_db():
     logger.info("Creating tables in EcoSortDB...")
     Base.metadata.create_all(bind=engine)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     logger.info("✅ Tables created successfully!")
 
 if __name__ == "__main__":
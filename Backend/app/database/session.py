@@ -1,19 +1,21 @@
 # app/session.py
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import get_settings
+from app.database.engine import create_db_engine
 
 settings = get_settings()
 
-# Engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+# Engine (the only sync engine in the app; pool settings come from Settings)
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database, for routes that should not block the event loop
+async_engine = create_db_engine(settings.ASYNC_DATABASE_URL, asynchronous=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base for models
 Base = declarative_base()
 
@@ -25,3 +27,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
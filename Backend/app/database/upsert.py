@@ -0,0 +1,49 @@
+# app/database/upsert.py
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from sqlalchemy import Table
+from sqlalchemy.engine import Dialect
+
+
+def upsert(
+    dialect: Dialect,
+    table: Table,
+    values: Dict[str, Any],
+    key_columns: Sequence[str],
+    update: Callable[[Any], List[Tuple[str, Any]]],
+):
+    """
+    INSERT `values`, or apply `update` to the existing row on a key conflict,
+    as a single statement (ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO
+    UPDATE on PostgreSQL / SQLite).
+
+    `update` receives the proposed row (`excluded` / `inserted`) and returns
+    ordered (column, expression) pairs. Expressions referring to the table's
+    own columns see the old values; keep read-before-write pairs first since
+    MySQL applies assignments left to right.
+    """
+    if dialect.name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table).values(**values)
+        return stmt.on_duplicate_key_update(update(stmt.inserted))
+
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on '{dialect.name}'")
+
+    stmt = insert(table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_=dict(update(stmt.excluded)),
+    )
+
+
+def supports_returning(dialect: Dialect) -> bool:
+    """
+    Whether an upsert can hand back the resulting row itself (MySQL needs a
+    follow-up SELECT in the same transaction).
+    """
+    return dialect.name in ("postgresql", "sqlite") and dialect.insert_returning
@@ -1,29 +1,14 @@
 # app/dependencies.py
 from typing import Generator, Optional
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine
-from contextlib import contextmanager
+from sqlalchemy.orm import Session
 from app.config import get_settings
+from app.database.session import SessionLocal
 from loguru import logger
 
 settings = get_settings()
 
-# Create SQLAlchemy Engine and SessionLocal
-# Notes:
-# - echo=False by default; set to True temporarily if debugging SQL statements.
-# - pool_pre_ping helps avoid stale connections in dev envs.
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-)
-
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    expire_on_commit=False,
-)
+# Sessions come from the app-wide engine in app.database.session (one pool
+# per worker, sized from Settings) instead of a second engine of our own.
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -43,10 +28,5 @@ def get_db() -> Generator[Session, None, None]:
         if db:
             db.close()
 
-# Auth placeholder: replace with real auth flow when ready
-def get_current_user():
-    """
-    Placeholder dependency for auth. Returns None until implemented.
-    Replace with proper JWT/session auth later.
-    """
-    return None
+# Auth: verified tokens and user lookups are cached (see app.services.auth_cache)
+from app.core.security import get_current_user, get_optional_user  # noqa: E402,F401
@@ -1,11 +1,27 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from app.core.logging import logger
 from app.config import get_settings
-from app.api.v1 import predict, gamification, auth
+from app.api.v1 import predict, gamification, auth, feedback, analytics, user, tts, chatbot
+from app.database.engine import describe_pool, pool_stats
+from app.database.session import async_engine, engine
+from app.services import yolo_service
+from app.services.inference_executor import executor as inference_executor
+from app.services.score_buffer import buffer as score_buffer
+from app.services.prediction_log import writer as prediction_log
+from app.services.password_hasher import hasher as password_hasher
+from app.services import tts_service
 
+# Heavy libraries (torch/ultralytics, Gemini, gTTS) load lazily, so this stays small
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 settings = get_settings()
 
@@ -24,6 +40,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
     )
 
     # Static folder
@@ -36,20 +53,65 @@ def create_app() -> FastAPI:
     app.include_router(predict.router, prefix="/api/v1", tags=["predict"])
     app.include_router(gamification.router, prefix="/api/v1", tags=["gamification"])
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
+    app.include_router(feedback.router, prefix="/api/v1", tags=["feedback"])
+    app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+    app.include_router(user.router, prefix="/api/v1", tags=["users"])
+    app.include_router(tts.router, prefix="/api/v1", tags=["tts"])
+    app.include_router(chatbot.router, prefix="/api/v1", tags=["chatbot"])
 
 
-    # Health check
+    # Health check (liveness)
     @app.get("/", tags=["health"])
     async def root():
         return {"app": settings.APP_NAME, "env": settings.APP_ENV, "status": "ok"}
 
+    # Readiness: 503 until the model is loaded when warm-up is enabled
+    @app.get("/ready", tags=["health"])
+    async def ready():
+        model = yolo_service.model_status()
+        is_ready = inference_executor.ready if settings.WARMUP_ON_STARTUP else model["error"] is None
+        return JSONResponse(
+            status_code=200 if is_ready else 503,
+            content={
+                "status": "ready" if is_ready else "starting",
+                "inference": {"mode": inference_executor.mode, "warmed_up": inference_executor.ready},
+                "model": model,
+            },
+        )
+
+    # Connection pool usage (checkouts, waits, timeouts) per engine
+    @app.get("/db/pool", tags=["health"])
+    async def db_pool():
+        return {"sync": pool_stats(engine), "async": pool_stats(async_engine)}
+
     @app.on_event("startup")
     async def startup_event():
         logger.info("Starting {app} (env={env})", app=settings.APP_NAME, env=settings.APP_ENV)
+        logger.info("App modules imported in {:.2f}s", IMPORT_SECONDS)
+        logger.info("DB engine: {}", describe_pool(engine))
+        logger.info("DB async engine: {}", describe_pool(async_engine))
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.error("Database is not reachable: {}", e)
+        # Replays unflushed score events from a previous run before serving
+        score_buffer.start()
+        prediction_log.start()
+        if settings.WARMUP_ON_STARTUP:
+            # Load the model in the background; /ready reports when it is done
+            asyncio.get_running_loop().run_in_executor(None, inference_executor.warm_up)
 
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("Shutting down {app}", app=settings.APP_NAME)
+        inference_executor.shutdown()
+        score_buffer.stop()
+        prediction_log.stop()
+        password_hasher.shutdown()
+        tts_service.shutdown()
+        await async_engine.dispose()
+        engine.dispose()
 
     return app
 
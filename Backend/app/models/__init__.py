@@ -4,9 +4,11 @@ SQLAlchemy ORM models for EcoSortAI:
 - Feedback
 - User
 - Leaderboard
+- PredictionLog, PredictionRollup, FeedbackRollup (analytics)
 """
 from app.models.feedback_m import Feedback
 from app.models.user import User
 from app.models.leaderboard import Leaderboard
+from app.models.analytics import PredictionLog, PredictionRollup, FeedbackRollup
 
-__all__ = ["Feedback", "User", "Leaderboard"]
+__all__ = ["Feedback", "User", "Leaderboard", "PredictionLog", "PredictionRollup", "FeedbackRollup"]
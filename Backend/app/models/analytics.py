@@ -0,0 +1,49 @@
+# app/models/analytics.py
+from sqlalchemy import Column, DateTime, Float, Integer, JSON, String, func
+from app.database.session import Base
+from app.utils.time_utils import utcnow
+
+class PredictionLog(Base):
+    """
+    One row per served prediction (raw events; dashboards read the rollups).
+    """
+    __tablename__ = "prediction_log"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), index=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    source = Column(String(16), nullable=False, default="image")  # image | video
+    label = Column(String(100), nullable=False)
+    confidence = Column(Float, nullable=False, default=0.0)
+    bboxes = Column(JSON, nullable=True)
+    latency_ms = Column(Float, nullable=True)
+    model_version = Column(String(64), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+
+
+class PredictionRollup(Base):
+    """
+    Predictions per (granularity, bucket, label); granularity is "hour" or "day"
+    and bucket_start is the UTC start of the bucket.
+    """
+    __tablename__ = "prediction_rollup"
+
+    granularity = Column(String(4), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    label = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+
+
+class FeedbackRollup(Base):
+    """
+    Feedback per (granularity, bucket, predicted, correct) - the confusion
+    matrix per bucket. correct_label "" means the user gave no correction.
+    """
+    __tablename__ = "feedback_rollup"
+
+    granularity = Column(String(4), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    predicted_label = Column(String(255), primary_key=True)
+    correct_label = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
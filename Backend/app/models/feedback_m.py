@@ -1,6 +1,7 @@
 # app/models/feedback.py
 from sqlalchemy import Column, Integer, String, DateTime, func
 from app.database.session import Base
+from app.utils.time_utils import utcnow
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -9,4 +10,4 @@ class Feedback(Base):
     user_id = Column(String(255), nullable=True)           # Added length
     predicted_label = Column(String(255), nullable=False)  # Added length
     correct_label = Column(String(255), nullable=True)     # Added length
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), index=True)  # incremental exports; UTC
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.database.session import Base
 
@@ -12,3 +12,9 @@ class Leaderboard(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", backref="leaderboard_entry")
+
+    # Ranking order (score desc, user_id asc): rank lookups are index range
+    # counts and keyset pages are forward index scans
+    __table_args__ = (
+        Index("ix_leaderboard_rank", score.desc(), user_id),
+    )
@@ -1,6 +1,25 @@
+from datetime import datetime
 from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class ConfusionEntry(BaseModel):
+    predicted: str
+    correct: str
+    count: int
+
+class AccuracyPoint(BaseModel):
+    bucket_start: datetime
+    feedback: int
+    accuracy: Optional[float] = None
 
 class AnalyticsResponse(BaseModel):
+    window: str
+    granularity: str
     total_predictions: int
-    most_common_label: str
-    accuracy: float
+    most_common_label: Optional[str] = None
+    label_distribution: Dict[str, int]
+    mean_confidence: Dict[str, float]
+    total_feedback: int
+    accuracy: Optional[float] = None
+    confusion: List[ConfusionEntry]
+    accuracy_series: List[AccuracyPoint]
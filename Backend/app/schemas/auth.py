@@ -17,6 +17,11 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+# For profile updates (all fields optional)
+class UserUpdate(BaseModel):
+    username: Optional[str] = None
+    email: Optional[EmailStr] = None
+
 # Token response
 class Token(BaseModel):
     access_token: str
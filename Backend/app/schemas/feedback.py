@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class FeedbackRequest(BaseModel):
     predicted_label: str
@@ -11,3 +11,10 @@ class FeedbackResponse(BaseModel):
     predicted: str
     correct: Optional[str] = None
     user_id: Optional[str] = None
+
+class FeedbackBulkRequest(BaseModel):
+    items: List[FeedbackRequest]
+
+class FeedbackBulkResponse(BaseModel):
+    status: str
+    inserted: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class LeaderboardEntry(BaseModel):
     user_id: int
@@ -13,6 +13,7 @@ class LeaderboardEntry(BaseModel):
 
 class LeaderboardResponse(BaseModel):
     entries: List[LeaderboardEntry]
+    next_cursor: Optional[str] = None
 
 class UserStats(BaseModel):
     user_id: int
@@ -0,0 +1,273 @@
+# app/services/analytics_services.py
+"""
+Dashboard analytics from hourly/daily rollup tables.
+
+The rollups are maintained incrementally in the same transaction as each
+feedback insert (and each prediction log batch), so dashboard reads only
+touch a few small, primary-key-ordered rows. After a bulk import or a
+schema change, rebuild them from the raw tables:
+
+    python -m app.services.analytics_services rebuild
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, case, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database.upsert import upsert
+from app.models.analytics import FeedbackRollup, PredictionLog, PredictionRollup
+from app.models.feedback_m import Feedback
+from app.utils.time_utils import utcnow
+from loguru import logger
+
+GRANULARITIES = ("hour", "day")
+
+# Dashboard window -> (length, rollup granularity to read)
+WINDOWS = {
+    "24h": (timedelta(hours=24), "hour"),
+    "7d": (timedelta(days=7), "day"),
+    "30d": (timedelta(days=30), "day"),
+    "90d": (timedelta(days=90), "day"),
+    "all": (None, "day"),
+}
+
+NO_CORRECTION = ""
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """
+    Start of the UTC hour/day containing `moment` (naive datetimes are UTC).
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def _increment_statement(dialect, model, counters: Tuple[str, ...]):
+    """
+    Batched upsert adding the bound counters onto a rollup row.
+    """
+    table = model.__table__
+    return upsert(
+        dialect,
+        table,
+        {column.name: bindparam(column.name) for column in table.columns},
+        [column.name for column in table.primary_key],
+        lambda new: [(name, table.c[name] + new[name]) for name in counters],
+    )
+
+
+def feedback_rollup_rows(records: Iterable[Tuple[str, Optional[str], datetime]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate (predicted, correct, created_at) records into rollup increments.
+    """
+    counts: Dict[tuple, int] = defaultdict(int)
+    for predicted, correct, created_at in records:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(created_at, granularity), predicted, correct or NO_CORRECTION)
+            counts[key] += 1
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket,
+            "predicted_label": predicted,
+            "correct_label": correct,
+            "count": count,
+        }
+        for (granularity, bucket, predicted, correct), count in counts.items()
+    ]
+
+
+def prediction_rollup_rows(events: Iterable[Tuple[str, float, datetime]]) -> List[Dict[str, Any]]:
+    """
+    Aggregate (label, confidence, created_at) events into rollup increments.
+    """
+    totals: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0.0])
+    for label, confidence, created_at in events:
+        for granularity in GRANULARITIES:
+            total = totals[(granularity, bucket_start(created_at, granularity), label)]
+            total[0] += 1
+            total[1] += confidence or 0.0
+    return [
+        {
+            "granularity": granularity,
+            "bucket_start": bucket,
+            "label": label,
+            "count": count,
+            "confidence_sum": confidence_sum,
+        }
+        for (granularity, bucket, label), (count, confidence_sum) in totals.items()
+    ]
+
+
+async def record_feedback(db: AsyncSession, records: Iterable[Tuple[str, Optional[str], datetime]]):
+    """
+    Add feedback (predicted, correct, created_at) records to the rollups,
+    bucketed by the rows' own created_at exactly as a rebuild would. Runs in
+    the caller's transaction, so the caller commits.
+    """
+    rows = feedback_rollup_rows(records)
+    if rows:
+        stmt = _increment_statement(db.get_bind().dialect, FeedbackRollup, ("count",))
+        await db.execute(stmt, rows)
+
+
+def record_predictions(db: Session, events: Iterable[Tuple[str, float, datetime]]):
+    """
+    Add prediction (label, confidence, created_at) events to the rollups, in
+    the caller's transaction.
+    """
+    rows = prediction_rollup_rows(events)
+    if rows:
+        stmt = _increment_statement(db.get_bind().dialect, PredictionRollup, ("count", "confidence_sum"))
+        db.execute(stmt, rows)
+
+
+class AnalyticsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def summary(self, window: str = "7d") -> Dict[str, Any]:
+        """
+        Totals, label distribution, confusion pairs and the accuracy series for
+        a dashboard window. Accuracy counts only feedback with a correction
+        label (predicted == correct over all corrected feedback).
+        """
+        length, granularity = WINDOWS[window]
+        since = bucket_start(utcnow() - length, granularity) if length else None
+
+        def in_window(model):
+            conditions = [model.granularity == granularity]
+            if since is not None:
+                conditions.append(model.bucket_start >= since)
+            return conditions
+
+        labels = (await self.db.execute(
+            select(
+                PredictionRollup.label,
+                func.sum(PredictionRollup.count),
+                func.sum(PredictionRollup.confidence_sum),
+            )
+            .where(*in_window(PredictionRollup))
+            .group_by(PredictionRollup.label)
+        )).all()
+
+        confusion = (await self.db.execute(
+            select(
+                FeedbackRollup.predicted_label,
+                FeedbackRollup.correct_label,
+                func.sum(FeedbackRollup.count),
+            )
+            .where(*in_window(FeedbackRollup))
+            .group_by(FeedbackRollup.predicted_label, FeedbackRollup.correct_label)
+        )).all()
+
+        reviewed = FeedbackRollup.correct_label != NO_CORRECTION
+        agreed = FeedbackRollup.predicted_label == FeedbackRollup.correct_label
+        series = (await self.db.execute(
+            select(
+                FeedbackRollup.bucket_start,
+                func.sum(FeedbackRollup.count),
+                func.sum(case((reviewed, FeedbackRollup.count), else_=0)),
+                func.sum(case((agreed, FeedbackRollup.count), else_=0)),
+            )
+            .where(*in_window(FeedbackRollup))
+            .group_by(FeedbackRollup.bucket_start)
+            .order_by(FeedbackRollup.bucket_start)
+        )).all()
+
+        distribution = {label: int(count) for label, count, _ in labels}
+        total_predictions = sum(distribution.values())
+        total_reviewed = sum(int(row[2]) for row in series)
+        total_agreed = sum(int(row[3]) for row in series)
+
+        return {
+            "window": window,
+            "granularity": granularity,
+            "total_predictions": total_predictions,
+            "most_common_label": max(distribution, key=distribution.get) if distribution else None,
+            "label_distribution": distribution,
+            "mean_confidence": {
+                label: float(confidence_sum) / int(count)
+                for label, count, confidence_sum in labels
+                if count
+            },
+            "total_feedback": sum(int(row[1]) for row in series),
+            "accuracy": total_agreed / total_reviewed if total_reviewed else None,
+            "confusion": [
+                {"predicted": predicted, "correct": correct, "count": int(count)}
+                for predicted, correct, count in confusion
+                if correct != NO_CORRECTION
+            ],
+            "accuracy_series": [
+                {
+                    "bucket_start": bucket,
+                    "feedback": int(feedback),
+                    "accuracy": int(agreed_count) / int(reviewed_count) if reviewed_count else None,
+                }
+                for bucket, feedback, reviewed_count, agreed_count in series
+            ],
+        }
+
+
+def rebuild_rollups(db: Session, chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    Recompute both rollup tables from the raw feedback and prediction_log
+    rows, replacing their current contents. Raw rows are streamed and
+    aggregated in memory (the rollups are small) before anything is written,
+    so the read cursor never shares the connection with writes.
+    """
+    scanned = {"feedback": 0, "predictions": 0}
+
+    def stream(query, name):
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for row in result:
+            scanned[name] += 1
+            yield row[0], row[1], row[2] or utcnow()
+
+    feedback_rows = feedback_rollup_rows(stream(
+        select(Feedback.predicted_label, Feedback.correct_label, Feedback.created_at), "feedback"
+    ))
+    prediction_rows = prediction_rollup_rows(stream(
+        select(PredictionLog.label, PredictionLog.confidence, PredictionLog.created_at), "predictions"
+    ))
+
+    dialect = db.get_bind().dialect
+    db.execute(delete(FeedbackRollup))
+    db.execute(delete(PredictionRollup))
+    if feedback_rows:
+        db.execute(_increment_statement(dialect, FeedbackRollup, ("count",)), feedback_rows)
+    if prediction_rows:
+        db.execute(_increment_statement(dialect, PredictionRollup, ("count", "confidence_sum")), prediction_rows)
+    db.commit()
+
+    logger.info(
+        f"Rebuilt analytics rollups from {scanned['feedback']} feedback "
+        f"and {scanned['predictions']} prediction rows"
+    )
+    return scanned
+
+
+def main(argv: List[str] | None = None) -> int:
+    from app.database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the analytics rollup tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_cmd = sub.add_parser("rebuild", help="recompute rollups from the raw tables")
+    rebuild_cmd.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        print(rebuild_rollups(db, args.chunk_size))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from app.schemas.auth import UserResponse
+
+settings = get_settings()
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWT payloads keyed by the token's SHA-256, so a
+    repeat request skips the signature check. An entry is only served until
+    the token's own `exp`; tokens without one are not cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (float(exp), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self._hits, "misses": self._misses}
+
+
+class UserCache:
+    """
+    Short-TTL cache of active users by email (the JWT subject). Writes to a
+    user (update, delete, password reset) call `invalidate`; other workers
+    see the change once their entry's TTL runs out.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, UserResponse]]" = OrderedDict()
+        self._emails: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, email: str) -> Optional[UserResponse]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._drop(email)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, user: UserResponse):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user.email] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.email)
+            self._emails[user.id] = user.email
+            while len(self._entries) > self.max_entries:
+                _, (_, old) = self._entries.popitem(last=False)
+                self._emails.pop(old.id, None)
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None):
+        with self._lock:
+            if user_id is not None:
+                email_for_id = self._emails.get(user_id)
+                if email_for_id is not None:
+                    self._drop(email_for_id)
+            if email is not None:
+                self._drop(email)
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+            }
+
+    def _drop(self, email: str):
+        # Called with the lock held
+        entry = self._entries.pop(email, None)
+        if entry is not None:
+            self._emails.pop(entry[1].id, None)
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+user_cache = UserCache(settings.USER_CACHE_TTL, settings.USER_CACHE_SIZE)
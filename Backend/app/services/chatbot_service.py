@@ -1,35 +1,226 @@
-import google.generativeai as genai
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from app.config import get_settings
 from loguru import logger
 
 settings = get_settings()
 
-# Configure Gemini client
-try:
-    if settings.GEMINI_API_KEY:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        logger.info("Gemini API client configured")
-    else:
-        logger.warning("Gemini API key not found! Chatbot will not work properly.")
-except Exception as e:
-    logger.error(f"Gemini API init failed: {e}")
+PROMPT = (
+    "You are EcoSortAI, an assistant that helps with waste management and recycling.\n"
+    "User: {message}\nAssistant:"
+)
+UNAVAILABLE_REPLY = "Chatbot unavailable (missing API key). Please try later."
+ERROR_REPLY = "Sorry, I had trouble answering. Please try again later."
+EMPTY_REPLY = "I couldn't generate a response."
 
+# Words that do not change what is being asked ("is a pizza box recyclable?"
+# and "Is pizza box recyclable" share one cache entry)
+_FILLER = {"a", "an", "the", "please", "pls", "hey", "hi", "hello"}
 
-def get_chatbot_response(message: str) -> str:
+
+def normalize_question(message: str) -> str:
+    """
+    Cache/coalescing key: NFKC, case-folded, punctuation and filler words
+    removed, whitespace collapsed.
+    """
+    text = unicodedata.normalize("NFKC", message).casefold()
+    words = re.sub(r"[^\w\s]", " ", text).split()
+    return " ".join(word for word in words if word not in _FILLER)
+
+
+class GeminiProvider:
+    """
+    Gemini through google-generativeai. The module is configured and the
+    model client built once, on first use.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(settings.GEMINI_API_KEY)
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=settings.GEMINI_API_KEY)
+                    self._model = genai.GenerativeModel(settings.GEMINI_MODEL)
+                    logger.info(f"Gemini API client configured ({settings.GEMINI_MODEL})")
+        return self._model
+
+    async def generate(self, message: str) -> Optional[str]:
+        response = await self._get_model().generate_content_async(PROMPT.format(message=message))
+        return response.text if response and hasattr(response, "text") else None
+
+
+class StubProvider:
+    """
+    Offline canned answers by keyword, for tests and local development.
+    """
+
+    name = "stub"
+    available = True
+
+    ANSWERS = (
+        ("pizza", "Clean parts of a pizza box go in paper recycling; greasy parts go in compost or general waste."),
+        ("batter", "Batteries are hazardous waste: take them to a battery drop-off point, never the regular bin."),
+        ("glass", "Rinse glass bottles and jars and put them in the glass recycling bin."),
+        ("plastic", "Rinse plastic containers and put them in the plastic recycling bin."),
+        ("paper", "Keep paper dry and clean and put it in the paper recycling bin."),
+        ("metal", "Rinse cans and put them in the metal recycling bin."),
+    )
+
+    async def generate(self, message: str) -> Optional[str]:
+        question = message.casefold()
+        for keyword, answer in self.ANSWERS:
+            if keyword in question:
+                return answer
+        return "Check the item's material and use the matching recycling bin; when unsure, ask your local facility."
+
+
+PROVIDERS = {
+    GeminiProvider.name: GeminiProvider,
+    StubProvider.name: StubProvider,
+}
+
+
+class ChatbotService:
+    """
+    Async chatbot front end. Answers are cached for `cache_ttl` seconds under
+    the normalized question, identical questions already in flight share one
+    provider call, and at most `max_concurrency` calls run at once, each
+    bounded by `timeout` (including the wait for a slot). Failures are never
+    cached.
+    """
+
+    def __init__(self, provider, timeout: float, max_concurrency: int, cache_ttl: float, cache_size: int):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Future[Tuple[str, bool]]"] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._timeouts = 0
+        self._errors = 0
+
+    async def reply(self, message: str) -> str:
+        if not self.provider.available:
+            return UNAVAILABLE_REPLY
+
+        key = normalize_question(message)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._hits += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced += 1
+        else:
+            self._misses += 1
+            task = asyncio.ensure_future(self._generate(message))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A caller going away must not cancel the call other callers share
+        answer, ok = await asyncio.shield(task)
+        if ok:
+            self._cache_put(key, answer)
+        return answer
+
+    async def _generate(self, message: str) -> Tuple[str, bool]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call():
+            async with self._semaphore:
+                return await self.provider.generate(message)
+
+        try:
+            text = await asyncio.wait_for(call(), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            logger.warning(f"Chatbot call timed out after {self.timeout}s")
+            return ERROR_REPLY, False
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"Chatbot provider error: {e}")
+            return ERROR_REPLY, False
+        if not text:
+            return EMPTY_REPLY, False
+        return text, True
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _cache_put(self, key: str, answer: str):
+        if self.cache_ttl <= 0 or self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, answer)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses + self._coalesced
+        return {
+            "provider": self.provider.name,
+            "cached": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_rate": (self._hits + self._coalesced) / lookups if lookups else 0.0,
+            "timeouts": self._timeouts,
+            "errors": self._errors,
+        }
+
+
+def create_provider(name: str | None = None):
+    """
+    Instantiate the configured (or given) chatbot provider.
+    """
+    name = (name or settings.CHATBOT_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown chatbot provider '{name}', expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[name]()
+
+
+chatbot = ChatbotService(
+    create_provider(),
+    timeout=settings.CHATBOT_TIMEOUT,
+    max_concurrency=settings.CHATBOT_MAX_CONCURRENCY,
+    cache_ttl=settings.CHATBOT_CACHE_TTL,
+    cache_size=settings.CHATBOT_CACHE_SIZE,
+)
+
+
+async def get_chatbot_response(message: str) -> str:
     """
-    Send user message to Gemini API and return reply.
+    Answer a user message (cached, coalesced, bounded by CHATBOT_TIMEOUT).
     Fallback: generic static response.
     """
-    if not settings.GEMINI_API_KEY:
-        return "Chatbot unavailable (missing API key). Please try later."
-
-    try:
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
-        response = model.generate_content(
-            f"You are EcoSortAI, an assistant that helps with waste management and recycling.\n"
-            f"User: {message}\nAssistant:"
-        )
-        return response.text if response and hasattr(response, "text") else "I couldn't generate a response."
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}")
-        return "Sorry, I had trouble answering. Please try again later."
+    return await chatbot.reply(message)
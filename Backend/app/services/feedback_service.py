@@ -1,22 +1,38 @@
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import async_engine
 from app.models.feedback_m import Feedback
+from app.services.analytics_services import record_feedback
+from app.utils.time_utils import utcnow
 from app.schemas.feedback import FeedbackRequest, FeedbackResponse
 from loguru import logger
 
-def save_feedback(db: Session, feedback_data: FeedbackRequest) -> FeedbackResponse:
+EXPORT_COLUMNS = ["id", "user_id", "predicted_label", "correct_label", "created_at"]
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+async def save_feedback(db: AsyncSession, feedback_data: FeedbackRequest) -> FeedbackResponse:
     """
     Save user feedback into the database.
     """
     try:
-        # Corrected: Use the imported class name, Feedback_m
-        feedback = Feedback_m(
+        feedback = Feedback(
             user_id=feedback_data.user_id,
             predicted_label=feedback_data.predicted_label,
             correct_label=feedback_data.correct_label,
+            created_at=utcnow(),
         )
         db.add(feedback)
-        db.commit()
-        db.refresh(feedback)
+        await record_feedback(db, [(feedback.predicted_label, feedback.correct_label, feedback.created_at)])
+        await db.commit()
 
         logger.info(f"Feedback stored: {feedback.id}")
         return FeedbackResponse(
@@ -27,7 +43,7 @@ def save_feedback(db: Session, feedback_data: FeedbackRequest) -> FeedbackRespon
         )
     except Exception as e:
         logger.error(f"Error saving feedback: {e}")
-        db.rollback()
+        await db.rollback()
         return FeedbackResponse(
             status="failed",
             predicted=feedback_data.predicted_label,
@@ -35,10 +51,129 @@ def save_feedback(db: Session, feedback_data: FeedbackRequest) -> FeedbackRespon
             user_id=feedback_data.user_id,
         )
 
-def get_all_feedback(db: Session):
+async def save_feedback_bulk(db: AsyncSession, items: List[FeedbackRequest]) -> int:
+    """
+    Insert many feedback records with a single executemany and one commit.
+    """
+    if not items:
+        return 0
+    now = utcnow()
+    await db.execute(insert(Feedback), [{**item.model_dump(), "created_at": now} for item in items])
+    await record_feedback(db, [(item.predicted_label, item.correct_label, now) for item in items])
+    await db.commit()
+    logger.info(f"Feedback stored: {len(items)} records (bulk)")
+    return len(items)
+
+async def get_all_feedback(db: AsyncSession, limit: int = 100, offset: int = 0):
+    """
+    Retrieve one page of feedback entries, newest first.
+    Use `stream_feedback` to pull the whole table for retraining.
+    """
+    query = select(Feedback).order_by(Feedback.id.desc()).offset(offset).limit(limit)
+    return (await db.scalars(query)).all()
+
+async def _export_rows(
+    since: Optional[datetime], until: Optional[datetime], chunk_size: int
+) -> AsyncIterator[List[dict]]:
     """
-    Retrieve all feedback entries.
-    Useful for analytics and model retraining.
+    Feedback rows in created_at order, fetched through a server-side cursor
+    in chunks of `chunk_size` so memory stays flat however big the table is.
     """
-    # Corrected: Use the imported class name, Feedback_m
-    return db.query(Feedback_m).all()
+    query = select(*[Feedback.__table__.c[name] for name in EXPORT_COLUMNS])
+    if since is not None:
+        query = query.where(Feedback.created_at >= since)
+    if until is not None:
+        query = query.where(Feedback.created_at < until)
+    query = query.order_by(Feedback.created_at, Feedback.id)
+
+    # Own connection: a streaming response outlives the request's session
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions(chunk_size):
+            yield [dict(row) for row in partition]
+
+def _encode_ndjson(rows: Iterable[dict]) -> bytes:
+    return "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+def _encode_csv(rows: Iterable[dict], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+class _ChunkSink:
+    """
+    Write-only file for pyarrow that hands written bytes back in pieces,
+    so a Parquet file can be streamed one row group at a time.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+async def stream_feedback(
+    fmt: str = "ndjson",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """
+    Export feedback as NDJSON, CSV or Parquet (one row group per chunk; needs
+    pyarrow), yielding encoded chunks as they are read from the database.
+    """
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("user_id", pa.string()),
+            ("predicted_label", pa.string()),
+            ("correct_label", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        async for rows in _export_rows(since, until, chunk_size):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+        return
+
+    first = True
+    async for rows in _export_rows(since, until, chunk_size):
+        yield _encode_csv(rows, header=first) if fmt == "csv" else _encode_ndjson(rows)
+        first = False
+    if fmt == "csv" and first:
+        yield _encode_csv([], header=True)
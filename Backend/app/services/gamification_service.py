@@ -1,114 +1,255 @@
-from sqlalchemy.orm import Session, joinedload
+import base64
+from typing import Optional, Tuple
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.upsert import supports_returning, upsert
 from app.models.leaderboard import Leaderboard
 from app.models.user import User
+from app.services.leaderboard_cache import cache as leaderboard_cache
+from app.services.score_buffer import SIGNUP_BONUS, analysis_points, analysis_points_expr
+from app.services.score_buffer import buffer as score_buffer
+
+# Ranking order used everywhere: score desc, ties by user_id asc
+RANK_ORDER = (Leaderboard.score.desc(), Leaderboard.user_id.asc())
+
+
+def encode_cursor(score: int, user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{score}:{user_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Raises ValueError for a malformed cursor.
+    """
+    try:
+        score, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return int(score), int(user_id)
+    except Exception:
+        raise ValueError("Invalid leaderboard cursor")
+
 
 class GamificationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_leaderboard(self):
-        results = (
-            self.db.query(Leaderboard, User.username)
-            .join(User, Leaderboard.user_id == User.id)
-            .order_by(Leaderboard.score.desc())
-            .all()
-        )
+    @staticmethod
+    def _ranked_query():
+        return select(Leaderboard, User.username).join(User, Leaderboard.user_id == User.id)
+
+    async def _rows(self, query):
+        return (await self.db.execute(query)).all()
 
-        entries = []
-        for idx, (row, username) in enumerate(results, start=1):
-            entries.append({
-                "user_id": row.user_id,
-                "username": username,
-                "score": row.score,
-                "items_analyzed": row.items_analyzed,
-                "rank": idx,
-            })
-        return {"entries": entries}
-
-    def update_leaderboard(self, user_id: int, score: int, items_analyzed: int):
-        entry = (
-            self.db.query(Leaderboard)
-            .options(joinedload(Leaderboard.user))
-            .filter_by(user_id=user_id)
-            .first()
+    @staticmethod
+    def _entry(row: Leaderboard, username: str, rank: int) -> dict:
+        return {
+            "user_id": row.user_id,
+            "username": username,
+            "score": row.score,
+            "items_analyzed": row.items_analyzed,
+            "rank": rank,
+        }
+
+    async def get_leaderboard(self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None):
+        """
+        One page of the leaderboard. With `cursor` (from a previous page's
+        next_cursor) the page starts right after that (score, user_id)
+        position via an index seek; otherwise `offset` is used.
+        """
+        query = self._ranked_query().order_by(*RANK_ORDER)
+        if cursor:
+            after_score, after_user_id = decode_cursor(cursor)
+            query = query.where(or_(
+                Leaderboard.score < after_score,
+                and_(Leaderboard.score == after_score, Leaderboard.user_id > after_user_id),
+            ))
+        else:
+            query = query.offset(offset)
+
+        # One extra row tells whether another page exists
+        results = await self._rows(query.limit(limit + 1))
+        has_more = len(results) > limit
+        results = results[:limit]
+
+        if not results:
+            return {"entries": [], "next_cursor": None}
+
+        first = results[0][0]
+        start_rank = await self._rank_of(first.score, first.user_id) if cursor else offset + 1
+        entries = [
+            self._entry(row, username, rank)
+            for rank, (row, username) in enumerate(results, start=start_rank)
+        ]
+        last = results[-1][0]
+        return {
+            "entries": entries,
+            "next_cursor": encode_cursor(last.score, last.user_id) if has_more else None,
+        }
+
+    async def get_leaderboard_window(self, user_id: int, size: int = 5):
+        """
+        The user's entry with up to `size` neighbours above and below.
+        Returns None if the user has no leaderboard entry.
+        """
+        me = (await self.db.execute(self._ranked_query().where(Leaderboard.user_id == user_id))).first()
+        if me is None:
+            return None
+        row, _ = me
+
+        above = await self._rows(
+            self._ranked_query()
+            .where(or_(
+                Leaderboard.score > row.score,
+                and_(Leaderboard.score == row.score, Leaderboard.user_id < row.user_id),
+            ))
+            .order_by(Leaderboard.score.asc(), Leaderboard.user_id.desc())
+            .limit(size)
+        )
+        below = await self._rows(
+            self._ranked_query()
+            .where(or_(
+                Leaderboard.score < row.score,
+                and_(Leaderboard.score == row.score, Leaderboard.user_id > row.user_id),
+            ))
+            .order_by(*RANK_ORDER)
+            .limit(size)
         )
 
-        if entry:
-            entry.score += score
-            entry.items_analyzed += items_analyzed
+        window = list(reversed(above)) + [me] + below
+        start_rank = await self._rank_of(row.score, row.user_id) - len(above)
+        return {
+            "entries": [
+                self._entry(entry, username, rank)
+                for rank, (entry, username) in enumerate(window, start=start_rank)
+            ],
+            "next_cursor": None,
+        }
+
+    async def _increment(self, user_id: int, values: dict, update) -> dict:
+        """
+        Atomic server-side score increment: a single upsert (returning the new
+        values where the dialect allows it), so concurrent writers never lose
+        points.
+        """
+        dialect = self.db.get_bind().dialect
+        table = Leaderboard.__table__
+        stmt = upsert(dialect, table, {"user_id": user_id, **values}, ["user_id"], update)
+
+        if supports_returning(dialect):
+            row = (await self.db.execute(
+                stmt.returning(table.c.user_id, table.c.score, table.c.items_analyzed)
+            )).one()
+            username = await self.db.scalar(select(User.username).where(User.id == user_id))
         else:
-            entry = Leaderboard(
-                user_id=user_id,
-                score=score,
-                items_analyzed=items_analyzed,
-            )
-            self.db.add(entry)
+            await self.db.execute(stmt)
+            row = (await self.db.execute(
+                select(table.c.user_id, table.c.score, table.c.items_analyzed, User.username)
+                .outerjoin(User, User.id == table.c.user_id)
+                .where(table.c.user_id == user_id)
+            )).one()
+            username = row.username
 
-        self.db.commit()
-        self.db.refresh(entry)
+        await self.db.commit()
+        leaderboard_cache.invalidate()
 
         return {
-            "user_id": entry.user_id,
-            "username": entry.user.username if entry.user else f"User{entry.user_id}",
-            "score": entry.score,
-            "items_analyzed": entry.items_analyzed,
+            "user_id": row.user_id,
+            "username": username or f"User{row.user_id}",
+            "score": row.score,
+            "items_analyzed": row.items_analyzed,
         }
 
-    def get_user_stats(self, user_id: int):
-        results = (
-            self.db.query(Leaderboard, User.username)
-            .join(User, Leaderboard.user_id == User.id)
-            .order_by(Leaderboard.score.desc())
-            .all()
+    async def _buffered_entry(self, user_id: int) -> dict:
+        """
+        Write-behind mode: the stored entry with the user's pending events applied.
+        """
+        row = (await self.db.execute(
+            select(Leaderboard.score, Leaderboard.items_analyzed).where(Leaderboard.user_id == user_id)
+        )).first()
+        username = await self.db.scalar(select(User.username).where(User.id == user_id))
+        score, items = score_buffer.merged(
+            user_id,
+            row.score if row else None,
+            row.items_analyzed if row else None,
         )
+        return {
+            "user_id": user_id,
+            "username": username or f"User{user_id}",
+            "score": score,
+            "items_analyzed": items,
+        }
 
-        for idx, (row, username) in enumerate(results, start=1):
-            if row.user_id == user_id:
-                return {
-                    "user_id": row.user_id,
-                    "score": row.score,
-                    "items_analyzed": row.items_analyzed,
-                    "rank": idx,
-                }
+    async def update_leaderboard(self, user_id: int, score: int, items_analyzed: int):
+        if score_buffer.enabled:
+            score_buffer.add(user_id, score=score, items=items_analyzed)
+            return await self._buffered_entry(user_id)
+
+        table = Leaderboard.__table__
+        return await self._increment(
+            user_id,
+            {"score": score, "items_analyzed": items_analyzed},
+            lambda new: [
+                ("score", table.c.score + new.score),
+                ("items_analyzed", table.c.items_analyzed + new.items_analyzed),
+            ],
+        )
 
+    async def _rank_of(self, score: int, user_id: int) -> int:
+        """
+        1-based position in (score desc, user_id asc) order, computed as two
+        range counts on ix_leaderboard_rank instead of a full sort.
+        """
+        higher = (
+            select(func.count())
+            .select_from(Leaderboard)
+            .where(Leaderboard.score > score)
+            .scalar_subquery()
+        )
+        tied_before = (
+            select(func.count())
+            .select_from(Leaderboard)
+            .where(and_(Leaderboard.score == score, Leaderboard.user_id < user_id))
+            .scalar_subquery()
+        )
+        return (await self.db.execute(select(higher + tied_before))).scalar_one() + 1
+
+    async def get_user_stats(self, user_id: int):
+        entry = await self.db.scalar(select(Leaderboard).where(Leaderboard.user_id == user_id))
+        score, items = (entry.score, entry.items_analyzed) if entry else (None, None)
+        if score_buffer.has_pending(user_id):
+            score, items = score_buffer.merged(user_id, score, items)
+
+        if score is not None:
+            return {
+                "user_id": user_id,
+                "score": score,
+                "items_analyzed": items,
+                "rank": await self._rank_of(score, user_id),
+            }
+
+        total = await self.db.scalar(select(func.count(Leaderboard.user_id)))
         return {
             "user_id": user_id,
             "score": 0,
             "items_analyzed": 0,
-            "rank": len(results) + 1,
+            "rank": total + 1,
         }
 
-    def add_analysis_points(self, user_id: int):
-        entry = (
-            self.db.query(Leaderboard)
-            .options(joinedload(Leaderboard.user))
-            .filter_by(user_id=user_id)
-            .first()
+    async def add_analysis_points(self, user_id: int):
+        """
+        150 points per analysis for the first five, 250 after that. A new
+        entry starts from the 10-point sign-up bonus plus its first analysis.
+        """
+        if score_buffer.enabled:
+            score_buffer.add(user_id, analyses=1)
+            return await self._buffered_entry(user_id)
+
+        table = Leaderboard.__table__
+        return await self._increment(
+            user_id,
+            {"score": SIGNUP_BONUS + analysis_points(0, 1), "items_analyzed": 1},
+            # score first: MySQL would otherwise see the incremented count
+            lambda new: [
+                ("score", table.c.score + analysis_points_expr(table.c.items_analyzed, 1)),
+                ("items_analyzed", table.c.items_analyzed + 1),
+            ],
         )
-
-        if not entry:
-            entry = Leaderboard(
-                user_id=user_id,
-                score=10,
-                items_analyzed=0,
-            )
-            self.db.add(entry)
-            self.db.commit()
-            self.db.refresh(entry)
-
-        # Determine points
-        points_to_add = 150 if entry.items_analyzed < 5 else 250
-
-        # Increment points and count
-        entry.score += points_to_add
-        entry.items_analyzed += 1
-
-        self.db.commit()
-        self.db.refresh(entry)
-
-        return {
-            "user_id": entry.user_id,
-            "username": entry.user.username if entry.user else f"User{entry.user_id}",
-            "score": entry.score,
-            "items_analyzed": entry.items_analyzed,
-        }
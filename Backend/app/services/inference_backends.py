@@ -0,0 +1,110 @@
+import os
+from typing import Any, Dict, List
+from app.config import get_settings
+from loguru import logger
+
+settings = get_settings()
+
+
+class InferenceBackend:
+    """
+    Wraps one way of running the detector. Every backend exposes the same
+    `predict(source=..., conf=..., iou=..., verbose=...)` and `names` as an
+    ultralytics model, so yolo_service does not care which one is active.
+    """
+
+    name = "base"
+
+    def __init__(self, weights_path: str):
+        self.weights_path = weights_path
+        self._model = None
+
+    def load(self) -> "InferenceBackend":
+        from ultralytics import YOLO
+
+        if not os.path.exists(self.weights_path):
+            raise FileNotFoundError(
+                f"{self.name} weights not found at {self.weights_path} "
+                f"(export them with: python -m app.services.model_export export --format {self.name})"
+            )
+        self._model = YOLO(self.weights_path, **self._load_kwargs())
+        return self
+
+    def predict(self, source: List[Any], **kwargs):
+        return self._model.predict(source=source, **kwargs)
+
+    @property
+    def names(self) -> Dict[int, str]:
+        return self._model.names
+
+    def _load_kwargs(self) -> Dict[str, Any]:
+        return {}
+
+
+class TorchBackend(InferenceBackend):
+    """
+    PyTorch weights (.pt) through ultralytics.
+    """
+
+    name = "torch"
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    Exported ONNX graph executed by ONNX Runtime (CPU execution provider).
+    """
+
+    name = "onnx"
+
+    def _load_kwargs(self) -> Dict[str, Any]:
+        return {"task": "detect"}
+
+
+class OpenVinoBackend(InferenceBackend):
+    """
+    Exported OpenVINO IR directory executed by the OpenVINO runtime.
+    """
+
+    name = "openvino"
+
+    def _load_kwargs(self) -> Dict[str, Any]:
+        return {"task": "detect"}
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxBackend.name: OnnxBackend,
+    OpenVinoBackend.name: OpenVinoBackend,
+}
+
+
+def weights_path_for(backend: str, int8: bool | None = None) -> str:
+    """
+    Weights location for a backend: the explicit setting if given,
+    otherwise the path `model_export` writes next to YOLO_MODEL_PATH.
+    `int8` defaults to YOLO_INT8; asking for the other precision ignores
+    the explicit setting, which names the configured precision's weights.
+    """
+    configured = int8 is None or int8 == settings.YOLO_INT8
+    int8 = settings.YOLO_INT8 if int8 is None else int8
+    stem = os.path.splitext(settings.YOLO_MODEL_PATH)[0]
+    if backend == "onnx":
+        explicit = settings.YOLO_ONNX_PATH if configured else ""
+        return explicit or (f"{stem}.int8.onnx" if int8 else f"{stem}.onnx")
+    if backend == "openvino":
+        suffix = "_int8_openvino_model" if int8 else "_openvino_model"
+        explicit = settings.YOLO_OPENVINO_PATH if configured else ""
+        return explicit or f"{stem}{suffix}"
+    return settings.YOLO_MODEL_PATH
+
+
+def create_backend(backend: str | None = None) -> InferenceBackend:
+    """
+    Instantiate and load the configured (or given) backend.
+    """
+    backend = (backend or settings.YOLO_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown YOLO backend '{backend}', expected one of {sorted(BACKENDS)}")
+    path = weights_path_for(backend)
+    logger.info(f"Loading YOLO model ({backend}) from {path}")
+    return BACKENDS[backend](path).load()
@@ -0,0 +1,171 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict
+from app.config import get_settings
+from loguru import logger
+
+settings = get_settings()
+
+
+class InferenceSaturatedError(RuntimeError):
+    """
+    Raised when every worker is busy and the wait queue is full.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference workers are saturated")
+        self.retry_after = retry_after
+
+
+def _init_process_worker():
+    """
+    Process-pool initializer: every worker process loads and warms up its
+    own model before it takes any work. Failures are left for
+    `_worker_ready` to report; raising here would break the whole pool.
+    """
+    try:
+        _load_worker_model()
+    except Exception as e:
+        logger.error(f"Inference worker warm-up failed: {e}")
+
+
+def _load_worker_model() -> bool:
+    from app.services import yolo_service
+
+    if yolo_service.load_model() is None:
+        return False
+    yolo_service.warm_up()
+    return True
+
+
+def _worker_ready() -> bool:
+    from app.services import yolo_service
+
+    return yolo_service.model is not None
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference calls off the event loop.
+    `mode` selects a thread pool (shared model, works with the batching
+    engine) or a process pool (one model per process, uses all cores).
+    At most `workers + max_queue` calls are admitted at once; beyond that
+    `run` fails fast with InferenceSaturatedError.
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int, retry_after: int):
+        self.mode = mode if mode in ("thread", "process") else "thread"
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._completed = 0
+        self._ready = False
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def warm_up(self) -> bool:
+        """
+        Load and warm up the model before traffic arrives (blocking).
+        In thread mode this loads the shared model once. In process mode
+        each worker process already did so in the pool initializer, so this
+        starts the workers and confirms the ones answering have a model.
+        Returns True when inference is usable.
+        """
+        started = time.perf_counter()
+        count = self.workers if self.mode == "process" else 1
+        check = _worker_ready if self.mode == "process" else _load_worker_model
+        try:
+            futures = [self._get_executor().submit(check) for _ in range(count)]
+            self._ready = all(future.result() for future in futures)
+        except Exception as e:
+            logger.error(f"Inference warm-up failed: {e}")
+            self._ready = False
+        logger.info(
+            f"Inference warm-up {'finished' if self._ready else 'failed'} "
+            f"in {time.perf_counter() - started:.2f}s ({self.mode}, {count} checks)"
+        )
+        return self._ready
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Await `fn(*args, **kwargs)` on the pool, rejecting when saturated.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise InferenceSaturatedError(self.retry_after)
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        # Release the slot when the work really finishes, not when the
+        # awaiting request goes away.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "ready": self._ready,
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.workers),
+                "capacity": self.capacity,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is not None:
+            return self._executor
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_process_worker,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="inference"
+                    )
+                logger.info(f"Inference executor started ({self.mode}, {self.workers} workers)")
+            return self._executor
+
+    def _release(self, future: Future | None):
+        with self._lock:
+            self._in_flight -= 1
+            if future is not None:
+                self._completed += 1
+
+
+executor = InferenceExecutor(
+    settings.INFERENCE_EXECUTOR,
+    settings.INFERENCE_WORKERS,
+    settings.INFERENCE_MAX_QUEUE,
+    settings.INFERENCE_RETRY_AFTER,
+)
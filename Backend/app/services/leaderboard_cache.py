@@ -0,0 +1,201 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from loguru import logger
+
+settings = get_settings()
+
+
+class MemoryBackend:
+    """
+    Per-process TTL store. Good enough for a single worker; use the Redis
+    backend so several workers share pages and invalidations. Entries are
+    kept in insertion (and so expiry) order: expired ones are pruned on every
+    write and the oldest go first beyond `max_entries`, so per-user and
+    cursor keys cannot pile up between invalidations.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._items[key]
+                return None
+            return item[1]
+
+    def set(self, key: str, value: str, ttl: float):
+        if self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (now + ttl, value)
+            while self._items:
+                _, (expires, _) = next(iter(self._items.items()))
+                if expires >= now and len(self._items) <= self.max_entries:
+                    break
+                self._items.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._items)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self):
+        with self._lock:
+            self._generation += 1
+            # Older generations can never be read again
+            self._items.clear()
+
+
+class RedisBackend:
+    """
+    Redis (or any Redis-compatible server) shared by all workers.
+    """
+
+    GENERATION_KEY = "ecosort:leaderboard:generation"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float):
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def generation(self) -> int:
+        return int(self._client.get(self.GENERATION_KEY) or 0)
+
+    def bump_generation(self):
+        self._client.incr(self.GENERATION_KEY)
+
+
+class LeaderboardCache:
+    """
+    Short-lived cache of ranked leaderboard pages, each stored with an ETag.
+    Score writes call `invalidate()`, which bumps a generation number that is
+    part of every key, so all cached pages go stale at once. Cache failures
+    only cost a database query.
+    """
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def etag_for(payload: Any) -> str:
+        body = json.dumps(payload, sort_keys=True, default=str)
+        return f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+    def get(self, key: str) -> Tuple[Optional[Tuple[str, Any]], Optional[int]]:
+        """
+        Cached (etag, payload) for `key` or None, plus the generation it was
+        looked up in; pass that generation to `put` after computing a miss.
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            generation = self.backend.generation()
+            raw = self.backend.get(self._key(key, generation))
+        except Exception as e:
+            self._record_error(e)
+            return None, None
+        with self._lock:
+            if raw is None:
+                self._misses += 1
+                return None, generation
+            self._hits += 1
+        item = json.loads(raw)
+        return (item["etag"], item["payload"]), generation
+
+    def put(self, key: str, payload: Any, generation: Optional[int]) -> str:
+        """
+        Store a freshly computed page under the generation it was read in;
+        returns its ETag. A page computed while an invalidation happened is
+        not stored, since it may predate the write.
+        """
+        etag = self.etag_for(payload)
+        if self.enabled and generation is not None:
+            try:
+                if self.backend.generation() == generation:
+                    value = json.dumps({"etag": etag, "payload": payload}, default=str)
+                    # Keyed by the read generation: even if an invalidation
+                    # lands right now, the entry can never be read again
+                    self.backend.set(self._key(key, generation), value, self.ttl)
+            except Exception as e:
+                self._record_error(e)
+        return etag
+
+    def invalidate(self):
+        if not self.enabled:
+            return
+        try:
+            self.backend.bump_generation()
+        except Exception as e:
+            self._record_error(e)
+        with self._lock:
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "errors": self._errors,
+            }
+
+    @staticmethod
+    def _key(key: str, generation: int) -> str:
+        return f"ecosort:leaderboard:{generation}:{key}"
+
+    def _record_error(self, error: Exception):
+        with self._lock:
+            self._errors += 1
+        logger.warning(f"Leaderboard cache unavailable: {error}")
+
+
+def _create_backend():
+    kind = settings.LEADERBOARD_CACHE_BACKEND.lower()
+    if kind == "redis":
+        try:
+            return RedisBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package not installed, using in-process leaderboard cache")
+            return MemoryBackend(settings.LEADERBOARD_CACHE_MAX_ENTRIES)
+    if kind == "memory":
+        return MemoryBackend(settings.LEADERBOARD_CACHE_MAX_ENTRIES)
+    return None
+
+
+cache = LeaderboardCache(_create_backend(), settings.LEADERBOARD_CACHE_TTL)
@@ -0,0 +1,185 @@
+# app/services/model_export.py
+"""
+Export the YOLO weights for the CPU backends and check them against PyTorch.
+
+    python -m app.services.model_export export --format onnx [--int8]
+    python -m app.services.model_export export --format openvino [--int8 --data data.yaml]
+    python -m app.services.model_export parity --backend onnx --samples path/to/images
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from typing import Any, Dict, List
+from app.config import get_settings
+from app.services.inference_backends import create_backend, weights_path_for
+from loguru import logger
+
+settings = get_settings()
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def export_model(fmt: str, int8: bool = False, imgsz: int | None = None, data: str | None = None) -> str:
+    """
+    Export YOLO_MODEL_PATH to `fmt` (onnx | openvino) with a dynamic batch
+    axis so the batching engine can feed it. Returns the exported path.
+    """
+    from ultralytics import YOLO
+
+    imgsz = imgsz or settings.YOLO_IMGSZ
+    model = YOLO(settings.YOLO_MODEL_PATH)
+
+    if fmt == "onnx":
+        path = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        if int8:
+            # Dynamic (weight-only) quantization needs no calibration data
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            int8_path = f"{os.path.splitext(path)[0]}.int8.onnx"
+            quantize_dynamic(path, int8_path, weight_type=QuantType.QUInt8)
+            path = int8_path
+    elif fmt == "openvino":
+        if int8 and not data:
+            raise ValueError("OpenVINO INT8 export needs a calibration dataset (--data)")
+        kwargs = {"int8": True, "data": data} if int8 else {}
+        path = model.export(format="openvino", imgsz=imgsz, dynamic=True, **kwargs)
+    else:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+
+    target = weights_path_for(fmt, int8=int8)
+    if os.path.abspath(path) != os.path.abspath(target):
+        # Keep the file where the backend will look for it by default
+        if os.path.isdir(path):
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(path, target)
+        else:
+            shutil.copyfile(path, target)
+        path = target
+
+    logger.info(f"Exported {fmt}{' int8' if int8 else ''} model to {path}")
+    return path
+
+
+def _iou(a: List[float], b: List[float]) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _detections(backend, image_path: str) -> List[Dict[str, Any]]:
+    result = backend.predict(
+        [image_path],
+        imgsz=settings.YOLO_IMGSZ,
+        conf=settings.YOLO_CONFIDENCE_THRESHOLD,
+        iou=settings.YOLO_IOU_THRESHOLD,
+        verbose=False,
+    )[0]
+    return [
+        {
+            "label": backend.names[int(box.cls[0])],
+            "confidence": float(box.conf[0]),
+            "bbox": box.xyxy[0].tolist(),
+        }
+        for box in result.boxes
+    ]
+
+
+def check_parity(backend_name: str, samples_dir: str, min_iou: float = 0.5) -> Dict[str, Any]:
+    """
+    Run the PyTorch reference and `backend_name` over every image in
+    `samples_dir` and compare top labels and boxes (greedy same-label IoU match).
+    """
+    images = sorted(
+        os.path.join(samples_dir, name)
+        for name in os.listdir(samples_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not images:
+        raise ValueError(f"No sample images found in {samples_dir}")
+
+    reference = create_backend("torch")
+    candidate = create_backend(backend_name)
+
+    top_label_matches = 0
+    matched_boxes = 0
+    reference_boxes = 0
+    ious: List[float] = []
+    conf_deltas: List[float] = []
+    timings = {"torch": 0.0, backend_name: 0.0}
+    mismatches = []
+
+    for path in images:
+        started = time.perf_counter()
+        expected = _detections(reference, path)
+        timings["torch"] += time.perf_counter() - started
+        started = time.perf_counter()
+        actual = _detections(candidate, path)
+        timings[backend_name] += time.perf_counter() - started
+
+        expected_top = expected[0]["label"] if expected else "unknown"
+        actual_top = actual[0]["label"] if actual else "unknown"
+        if expected_top == actual_top:
+            top_label_matches += 1
+        else:
+            mismatches.append({"image": os.path.basename(path), "torch": expected_top, backend_name: actual_top})
+
+        unused = list(actual)
+        reference_boxes += len(expected)
+        for det in expected:
+            candidates = [(_iou(det["bbox"], other["bbox"]), other) for other in unused if other["label"] == det["label"]]
+            if not candidates:
+                continue
+            best_iou, best = max(candidates, key=lambda item: item[0])
+            if best_iou >= min_iou:
+                unused.remove(best)
+                matched_boxes += 1
+                ious.append(best_iou)
+                conf_deltas.append(abs(det["confidence"] - best["confidence"]))
+
+    count = len(images)
+    return {
+        "backend": backend_name,
+        "images": count,
+        "top_label_agreement": top_label_matches / count,
+        "box_recall": matched_boxes / reference_boxes if reference_boxes else 1.0,
+        "mean_iou": sum(ious) / len(ious) if ious else 0.0,
+        "mean_confidence_delta": sum(conf_deltas) / len(conf_deltas) if conf_deltas else 0.0,
+        "ms_per_image": {name: total * 1000 / count for name, total in timings.items()},
+        "mismatches": mismatches,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export and verify YOLO inference backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = sub.add_parser("export", help="export YOLO_MODEL_PATH for a CPU backend")
+    export_cmd.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    export_cmd.add_argument("--int8", action="store_true", help="quantize weights to INT8")
+    export_cmd.add_argument("--imgsz", type=int, default=None)
+    export_cmd.add_argument("--data", default=None, help="calibration dataset yaml (OpenVINO INT8)")
+
+    parity_cmd = sub.add_parser("parity", help="compare a backend with PyTorch on sample images")
+    parity_cmd.add_argument("--backend", choices=["onnx", "openvino"], default="onnx")
+    parity_cmd.add_argument("--samples", required=True, help="directory of sample images")
+    parity_cmd.add_argument("--min-iou", type=float, default=0.5)
+    parity_cmd.add_argument("--min-agreement", type=float, default=0.98)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(export_model(args.format, args.int8, args.imgsz, args.data))
+        return 0
+
+    report = check_parity(args.backend, args.samples, args.min_iou)
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    return 0 if report["top_label_agreement"] >= args.min_agreement else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
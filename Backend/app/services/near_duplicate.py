@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def dhash(image: np.ndarray) -> int:
+    """
+    64-bit difference hash of a BGR image: robust to rescaling, recompression
+    and small framing changes, so near-identical photos land a few bits apart.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance. Each node is
+    [hash, children-by-distance]; a range query only descends into children
+    whose edge distance lies within `threshold` of the query distance.
+    """
+
+    def __init__(self):
+        self._root: Optional[list] = None
+
+    def add(self, value: int):
+        if self._root is None:
+            self._root = [value, {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [value, {}]
+                return
+            node = child
+
+    def nearest(self, value: int, threshold: int) -> Optional[Tuple[int, int]]:
+        """
+        Closest stored hash within `threshold`, as (hash, distance).
+        """
+        if self._root is None:
+            return None
+        best: Optional[Tuple[int, int]] = None
+        stack: List[list] = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= threshold and (best is None or distance < best[1]):
+                best = (node[0], distance)
+                if distance == 0:
+                    break
+            limit = best[1] if best is not None else threshold
+            for edge, child in node[1].items():
+                if distance - limit <= edge <= distance + limit:
+                    stack.append(child)
+        return best
+
+
+class NearDuplicateIndex:
+    """
+    Perceptual-hash index of recent predictions. A lookup returns the cached
+    result of a previously seen image within `threshold` Hamming bits.
+    The oldest 10% of entries are dropped (and the tree rebuilt) once
+    `max_entries` is exceeded.
+    """
+
+    def __init__(self, enabled: bool, threshold: int, max_entries: int):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self._results: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._hits = 0
+        self._hit_distance_total = 0
+
+    def lookup(self, image: np.ndarray) -> Tuple[int, Optional[Dict[str, Any]]]:
+        value = dhash(image)
+        with self._lock:
+            self._lookups += 1
+            match = self._tree.nearest(value, self.threshold)
+            if match is None:
+                return value, None
+            self._hits += 1
+            self._hit_distance_total += match[1]
+            self._results.move_to_end(match[0])
+            return value, self._results[match[0]]
+
+    def add(self, value: int, result: Dict[str, Any]):
+        with self._lock:
+            if value not in self._results:
+                self._tree.add(value)
+            self._results[value] = result
+            self._results.move_to_end(value)
+            if len(self._results) > self.max_entries:
+                for _ in range(max(1, self.max_entries // 10)):
+                    self._results.popitem(last=False)
+                self._tree = BKTree()
+                for kept in self._results:
+                    self._tree.add(kept)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "entries": len(self._results),
+                "lookups": self._lookups,
+                "hits": self._hits,
+                "hit_rate": self._hits / self._lookups if self._lookups else 0.0,
+                "avg_hit_distance": self._hit_distance_total / self._hits if self._hits else 0.0,
+            }
+
+
+index = NearDuplicateIndex(
+    settings.NEAR_DUP_ENABLED,
+    settings.NEAR_DUP_THRESHOLD,
+    settings.NEAR_DUP_MAX_ENTRIES,
+)
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.config import get_settings
+from app.utils.auth_utils import hash_password, verify_and_update_password
+from loguru import logger
+
+settings = get_settings()
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """
+    Raised when the hashing pool is full or a job waited past the queue timeout.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing is saturated")
+        self.retry_after = retry_after
+
+
+class _LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.wait_total = 0.0
+
+    def record(self, seconds: float, waited: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.wait_total += waited
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "avg_wait_ms": self.wait_total * 1000 / self.count if self.count else 0.0,
+        }
+
+
+class PasswordHasher:
+    """
+    Runs Argon2 hash/verify on a dedicated, small thread pool (argon2-cffi
+    releases the GIL) so login bursts cannot take over the event loop or the
+    shared threadpool. At most `workers + max_queue` jobs are admitted; a job
+    that waited longer than `queue_timeout` for a worker is dropped before
+    hashing. Both cases raise PasswordHasherBusyError.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._latency = {"hash": _LatencyStats(), "verify": _LatencyStats()}
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; also returns a new hash when the stored one was
+        made with outdated Argon2 parameters (None otherwise).
+        """
+        return await self._run("verify", verify_and_update_password, password, hashed)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        valid, _ = await self.verify_and_update(password, hashed)
+        return valid
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "capacity": self.workers + self.max_queue,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "argon2": {
+                    "time_cost": settings.ARGON2_TIME_COST,
+                    "memory_cost_kib": settings.ARGON2_MEMORY_COST,
+                    "parallelism": settings.ARGON2_PARALLELISM,
+                },
+                **{kind: stats.as_dict() for kind, stats in self._latency.items()},
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusyError(self.retry_after)
+            self._in_flight += 1
+
+        enqueued = time.perf_counter()
+
+        def job():
+            waited = time.perf_counter() - enqueued
+            if waited > self.queue_timeout:
+                with self._lock:
+                    self._timed_out += 1
+                raise PasswordHasherBusyError(self.retry_after)
+            started = time.perf_counter()
+            result = fn(*args)
+            with self._lock:
+                self._latency[kind].record(time.perf_counter() - started, waited)
+            return result
+
+        try:
+            future = self._get_executor().submit(job)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is not None:
+            return self._executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+                logger.info(f"Password hasher started ({self.workers} workers)")
+            return self._executor
+
+    def _release(self, _future: Future | None):
+        with self._lock:
+            self._in_flight -= 1
+
+
+hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+    settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+    settings.PASSWORD_HASH_RETRY_AFTER,
+)
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from app.services import yolo_service
+from loguru import logger
+
+settings = get_settings()
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of image predictions.
+    Entries are keyed by the SHA-256 of the upload bytes plus a namespace
+    (model version and thresholds), so a new model or new thresholds never
+    serve stale results. Two tiers: an in-process LRU and an optional
+    on-disk JSON store with size-based eviction (oldest first).
+    """
+
+    def __init__(self, namespace: str, max_entries: int, disk_dir: str = "", disk_max_bytes: int = 0):
+        self.namespace = hashlib.sha256(namespace.encode()).hexdigest()[:16]
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.disk_dir)
+
+    def lookup(self, data: bytes) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Hash the upload and return (content_hash, cached result or None).
+        """
+        content_hash = hashlib.sha256(data).hexdigest()
+        if not self.enabled:
+            return content_hash, None
+        return content_hash, self.get(content_hash)
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        key = self._key(content_hash)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return result
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+        self._remember(key, result)
+        return result
+
+    def put(self, content_hash: str, result: Dict[str, Any]):
+        """
+        Store a result in the in-process tier.
+        """
+        if self.max_entries > 0:
+            self._remember(self._key(content_hash), result)
+
+    def persist(self, content_hash: str, result: Dict[str, Any]):
+        """
+        Store a result in the on-disk tier (run as a background task).
+        """
+        if not self.disk_dir:
+            return
+        path = self._disk_path(self._key(content_hash))
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = json.dumps(result).encode()
+            # Unique per write: concurrent persists of one result must not share it
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(payload)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Prediction cache write failed: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(payload)
+        self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._memory_hits + self._disk_hits) / lookups if lookups else 0.0,
+                "disk_dir": self.disk_dir or None,
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _key(self, content_hash: str) -> str:
+        return f"{content_hash}-{self.namespace}"
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as fh:
+                result = json.loads(fh.read())
+            os.utime(path)  # keep recently used entries on eviction
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Prediction cache read failed for {path}: {e}")
+            return None
+
+    def _scan_disk(self):
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _evict_disk(self):
+        if self.disk_max_bytes <= 0:
+            return
+        with self._lock:
+            known = self._disk_bytes
+        if known is not None and known <= self.disk_max_bytes:
+            return
+
+        files = self._scan_disk()
+        total = sum(size for _, size, _ in files)
+        # Trim to 90% so eviction does not run on every write
+        target = int(self.disk_max_bytes * 0.9) if total > self.disk_max_bytes else total
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+
+cache = PredictionCache(
+    namespace=yolo_service.model_fingerprint(),
+    max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES if settings.PREDICTION_CACHE_ENABLED else 0,
+    disk_dir=settings.PREDICTION_CACHE_DIR if settings.PREDICTION_CACHE_ENABLED else "",
+    disk_max_bytes=settings.PREDICTION_CACHE_DISK_MAX_MB * 1024 * 1024,
+)
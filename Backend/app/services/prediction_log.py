@@ -0,0 +1,222 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from app.config import get_settings
+from app.database.session import SessionLocal
+from app.models.analytics import PredictionLog
+from app.services.analytics_services import record_predictions
+from app.utils.time_utils import utcnow
+from loguru import logger
+
+settings = get_settings()
+
+
+class DatabaseSink:
+    """
+    Batched INSERT into prediction_log; the analytics rollups are updated in
+    the same transaction.
+    """
+
+    name = "db"
+
+    def write(self, events: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(PredictionLog), events)
+            record_predictions(db, ((e["label"], e["confidence"], e["created_at"]) for e in events))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        pass
+
+
+class NdjsonSink:
+    """
+    Appends events to gzip-compressed NDJSON files in `directory`, starting a
+    new file once `rotate_bytes` of uncompressed data were written and keeping
+    the newest `backups` files. Every batch is sync-flushed, so a crash loses
+    at most the batch being written.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: str, rotate_bytes: int, backups: int):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self.backups = backups
+        self._file = None
+        self._written = 0
+
+    def write(self, events: List[Dict[str, Any]]):
+        if self._file is None or self._written >= self.rotate_bytes:
+            self._rotate()
+        data = "".join(json.dumps(event, default=str) + "\n" for event in events).encode()
+        self._file.write(data)
+        self._file.flush()
+        self._written += len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"predictions-{datetime.utcnow():%Y%m%d-%H%M%S-%f}.ndjson.gz"
+        self._file = gzip.open(os.path.join(self.directory, name), "ab")
+        self._written = 0
+
+        files = sorted(f for f in os.listdir(self.directory) if f.startswith("predictions-"))
+        for old in files[:-self.backups] if self.backups > 0 else []:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+
+class PredictionLogWriter:
+    """
+    Non-blocking prediction event log. `log()` only does a put_nowait on a
+    bounded queue; a background thread drains it in batches of up to
+    `batch_size` (or whatever arrived within `flush_interval`) into the sink.
+    When the queue is full the event is dropped and counted rather than
+    slowing /predict down.
+    """
+
+    def __init__(self, sink, max_queue: int, batch_size: int, flush_interval: float):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._logged = 0
+        self._written = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._batches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the writer thread after it has drained the queue.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.sink.close()
+
+    def log(self, **event) -> bool:
+        """
+        Queue one prediction event; returns False if it was dropped.
+        """
+        if not self.enabled:
+            return False
+        event.setdefault("created_at", utcnow())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Prediction log queue full, {dropped} events dropped so far")
+            return False
+        with self._lock:
+            self._logged += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sink": self.sink.name if self.sink else None,
+                "queued": self._queue.qsize(),
+                "logged": self._logged,
+                "written": self._written,
+                "dropped": self._dropped,
+                "write_errors": self._write_errors,
+                "batches": self._batches,
+            }
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                # Take what is already queued without waiting any longer
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.sink.write(batch)
+            except Exception as e:
+                with self._lock:
+                    self._write_errors += len(batch)
+                logger.error(f"Prediction log write of {len(batch)} events failed: {e}")
+                continue
+            with self._lock:
+                self._written += len(batch)
+                self._batches += 1
+
+
+def _create_sink():
+    kind = settings.PREDICTION_LOG_SINK.lower()
+    if kind == "db":
+        return DatabaseSink()
+    if kind == "file":
+        return NdjsonSink(
+            settings.PREDICTION_LOG_DIR,
+            settings.PREDICTION_LOG_ROTATE_MB * 1024 * 1024,
+            settings.PREDICTION_LOG_BACKUPS,
+        )
+    return None
+
+
+writer = PredictionLogWriter(
+    _create_sink(),
+    max_queue=settings.PREDICTION_LOG_MAX_QUEUE,
+    batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+    flush_interval=settings.PREDICTION_LOG_FLUSH_INTERVAL,
+)
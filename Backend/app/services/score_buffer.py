@@ -0,0 +1,331 @@
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import Integer, bindparam, case
+from app.config import get_settings
+from app.database.session import SessionLocal
+from app.database.upsert import upsert
+from app.models.leaderboard import Leaderboard
+from app.services.leaderboard_cache import cache as leaderboard_cache
+from loguru import logger
+
+settings = get_settings()
+
+# Analysis scoring: 150 points for each of a user's first five analyses,
+# 250 after that; a new entry also gets the 10-point sign-up bonus
+EARLY_ANALYSES = 5
+EARLY_POINTS = 150
+POINTS = 250
+SIGNUP_BONUS = 10
+
+
+def analysis_points(items_before: int, analyses: int) -> int:
+    """
+    Points for `analyses` analyses by a user who already has `items_before`.
+    """
+    early = min(analyses, max(0, EARLY_ANALYSES - items_before))
+    return POINTS * analyses - (POINTS - EARLY_POINTS) * early
+
+
+def analysis_points_expr(items_column, analyses):
+    """
+    SQL form of `analysis_points` over the stored items count.
+    """
+    early = case(
+        (items_column >= EARLY_ANALYSES, 0),
+        (EARLY_ANALYSES - items_column > analyses, analyses),
+        else_=EARLY_ANALYSES - items_column,
+    )
+    return POINTS * analyses - (POINTS - EARLY_POINTS) * early
+
+
+DELTA_FIELDS = ("score", "items", "analyses", "updates")
+
+
+def _empty_delta() -> Dict[str, int]:
+    return dict.fromkeys(DELTA_FIELDS, 0)
+
+
+class ScoreBuffer:
+    """
+    Write-behind buffer for leaderboard events. Events are coalesced per user
+    in memory (and appended to an optional JSONL log) and written by a flush
+    thread as one batched upsert every `flush_interval` seconds, or sooner
+    once `flush_size` users are pending.
+
+    Within one flush a user's score/items writes are applied before their
+    analyses, so analysis points are always computed from the merged items
+    count; `updates` counts those writes, since a row they create gets no
+    sign-up bonus.
+
+    Each flush rotates the log into a segment that is deleted after the batch
+    commits; segments and the live log left behind by a crash are replayed on
+    start, in order, honouring the tombstones written by `discard`. Delivery
+    is at-least-once: a crash between the commit and the segment delete
+    replays that batch.
+    """
+
+    def __init__(self, enabled: bool, flush_interval: float, flush_size: int, log_path: str = "", fsync: bool = False):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.flush_size = max(1, flush_size)
+        self.log_path = log_path
+        self.fsync = fsync
+        self._pending: Dict[int, Dict[str, int]] = {}
+        self._segments: List[str] = []
+        self._discarded: Set[int] = set()
+        self._log = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._events = 0
+        self._flushes = 0
+        self._flushed_users = 0
+        self._failures = 0
+        self._last_flush_ms = 0.0
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        if self.log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            self._replay()
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="score-buffer", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Score write-behind enabled (every {self.flush_interval}s or {self.flush_size} users, "
+            f"log={self.log_path or 'memory only'})"
+        )
+        if self._pending:
+            self._wake.set()
+
+    def stop(self):
+        """
+        Stop the flush thread and write whatever is still pending.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def add(self, user_id: int, score: int = 0, items: int = 0, analyses: int = 0):
+        event = {"user_id": user_id, "score": score, "items": items, "analyses": analyses, "updates": 0 if analyses else 1}
+        with self._lock:
+            self._append(event)
+            self._merge(event)
+            self._events += 1
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self._wake.set()
+
+    def discard(self, user_id: int):
+        """
+        Drop a user's pending events (the user is being deleted). A tombstone
+        goes to the log so replay drops the events logged before it, and a
+        flush in progress does not put them back if it fails.
+        """
+        with self._lock:
+            self._append({"user_id": user_id, "discard": True})
+            self._pending.pop(user_id, None)
+            self._discarded.add(user_id)
+
+    def has_pending(self, user_id: int) -> bool:
+        with self._lock:
+            return user_id in self._pending
+
+    def merged(self, user_id: int, score: Optional[int], items: Optional[int]) -> Tuple[int, int]:
+        """
+        Stored (score, items_analyzed) with the user's pending events applied,
+        exactly as the next flush will write them. None means no stored row.
+        """
+        with self._lock:
+            delta = dict(self._pending.get(user_id) or _empty_delta())
+        if score is None:
+            return self._new_row(delta)
+        items += delta["items"]
+        score += delta["score"] + analysis_points(items, delta["analyses"])
+        return score, items + delta["analyses"]
+
+    def flush(self) -> int:
+        """
+        Write all pending deltas in one batched upsert. Returns the number of
+        users written; on failure the deltas go back into the buffer.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._discarded.clear()
+                self._rotate_log()
+                segments = list(self._segments)
+
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception as e:
+                with self._lock:
+                    for user_id, delta in batch.items():
+                        if user_id not in self._discarded:
+                            self._merge({"user_id": user_id, **delta})
+                    self._failures += 1
+                logger.error(f"Score buffer flush of {len(batch)} users failed: {e}")
+                return 0
+
+            for path in segments:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._segments = [path for path in self._segments if path not in segments]
+                self._flushes += 1
+                self._flushed_users += len(batch)
+                self._last_flush_ms = (time.perf_counter() - started) * 1000
+            leaderboard_cache.invalidate()
+            return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "pending_users": len(self._pending),
+                "events": self._events,
+                "flushes": self._flushes,
+                "flushed_users": self._flushed_users,
+                "failures": self._failures,
+                "last_flush_ms": self._last_flush_ms,
+                "log": self.log_path or None,
+            }
+
+    def _append(self, record: Dict[str, Any]):
+        # Called with the lock held
+        if self._log is None:
+            return
+        self._log.write(json.dumps(record) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _merge(self, event: Dict[str, int]):
+        delta = self._pending.setdefault(event["user_id"], _empty_delta())
+        for field in DELTA_FIELDS:
+            delta[field] += event.get(field, 0)
+
+    def _rotate_log(self):
+        # Called with the lock held: later events go to a fresh log
+        if self._log is None:
+            return
+        self._log.close()
+        segment = f"{self.log_path}.{time.time_ns()}.flushing"
+        os.replace(self.log_path, segment)
+        self._segments.append(segment)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def _replay(self):
+        paths = sorted(glob.glob(f"{glob.escape(self.log_path)}.*.flushing"))
+        if os.path.exists(self.log_path):
+            segment = f"{self.log_path}.{time.time_ns()}.flushing"
+            os.replace(self.log_path, segment)
+            paths.append(segment)
+
+        replayed = 0
+        for path in paths:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        event = json.loads(line)
+                        if event.get("discard"):
+                            self._pending.pop(event["user_id"], None)
+                        else:
+                            self._merge(event)
+                            replayed += 1
+                    except (ValueError, KeyError):
+                        # Torn last line from a crash mid-write
+                        logger.warning(f"Skipping unreadable score event in {path}")
+            self._segments.append(path)
+        if replayed:
+            logger.info(f"Replayed {replayed} unflushed score events for {len(self._pending)} users")
+
+    def _write(self, batch: Dict[int, Dict[str, int]]):
+        table = Leaderboard.__table__
+        analyses = bindparam("analyses", type_=Integer)
+        items_delta = bindparam("items_delta", type_=Integer)
+        db = SessionLocal()
+        try:
+            stmt = upsert(
+                db.get_bind().dialect,
+                table,
+                {
+                    "user_id": bindparam("uid"),
+                    "score": bindparam("new_score"),
+                    "items_analyzed": bindparam("new_items"),
+                },
+                ["user_id"],
+                # score first: MySQL would otherwise see the incremented count;
+                # analysis points use the count after this batch's items
+                lambda new: [
+                    ("score", table.c.score + bindparam("score_delta", type_=Integer)
+                        + analysis_points_expr(table.c.items_analyzed + items_delta, analyses)),
+                    ("items_analyzed", table.c.items_analyzed + items_delta + analyses),
+                ],
+            )
+            rows = []
+            for user_id, delta in batch.items():
+                new_score, new_items = self._new_row(delta)
+                rows.append({
+                    "uid": user_id,
+                    "new_score": new_score,
+                    "new_items": new_items,
+                    "score_delta": delta["score"],
+                    "items_delta": delta["items"],
+                    "analyses": delta["analyses"],
+                })
+            db.execute(stmt, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _new_row(delta: Dict[str, int]) -> Tuple[int, int]:
+        # A row created by a score/items write starts without the bonus
+        bonus = SIGNUP_BONUS if delta["analyses"] and not delta["updates"] else 0
+        score = bonus + delta["score"] + analysis_points(delta["items"], delta["analyses"])
+        return score, delta["items"] + delta["analyses"]
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Score buffer flush error: {e}")
+
+
+buffer = ScoreBuffer(
+    enabled=settings.SCORE_BUFFER_ENABLED,
+    flush_interval=settings.SCORE_BUFFER_FLUSH_INTERVAL,
+    flush_size=settings.SCORE_BUFFER_FLUSH_SIZE,
+    log_path=settings.SCORE_BUFFER_LOG,
+    fsync=settings.SCORE_BUFFER_FSYNC,
+)
@@ -0,0 +1,166 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Dict, Iterator
+from app.config import get_settings
+from loguru import logger
+
+settings = get_settings()
+
+
+class TTSProvider:
+    """
+    One speech engine. `synthesize` writes a complete audio file; `stream`
+    yields audio bytes as they are produced. The default `stream` renders a
+    temporary file first, for engines that cannot do better.
+    """
+
+    name = "base"
+    extension = "mp3"
+    media_type = "audio/mpeg"
+
+    def synthesize(self, text: str, lang: str, path: str):
+        raise NotImplementedError
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        fd, path = tempfile.mkstemp(suffix=f".{self.extension}")
+        os.close(fd)
+        try:
+            self.synthesize(text, lang, path)
+            with open(path, "rb") as fh:
+                while chunk := fh.read(settings.TTS_STREAM_CHUNK_BYTES):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+
+class GTTSProvider(TTSProvider):
+    """
+    Google Translate TTS (needs network). Streaming yields each sentence
+    part's mp3 as soon as it is fetched.
+    """
+
+    name = "gtts"
+
+    def synthesize(self, text: str, lang: str, path: str):
+        from gtts import gTTS
+
+        gTTS(text=text, lang=lang).save(path)
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        from gtts import gTTS
+
+        yield from gTTS(text=text, lang=lang).stream()
+
+
+class EspeakProvider(TTSProvider):
+    """
+    Local espeak-ng / espeak binary, fully offline. Text goes in on stdin and
+    WAV comes back on stdout, so streaming forwards audio while it is still
+    being synthesized.
+    """
+
+    name = "espeak"
+    extension = "wav"
+    media_type = "audio/wav"
+
+    def synthesize(self, text: str, lang: str, path: str):
+        subprocess.run(
+            [self._binary(), "-v", lang, "-w", path],
+            input=text.encode(),
+            check=True,
+            capture_output=True,
+            timeout=settings.TTS_TIMEOUT,
+        )
+
+    def stream(self, text: str, lang: str) -> Iterator[bytes]:
+        proc = subprocess.Popen(
+            [self._binary(), "-v", lang, "--stdout"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            proc.stdin.write(text.encode())
+            proc.stdin.close()
+            while chunk := proc.stdout.read1(settings.TTS_STREAM_CHUNK_BYTES):
+                yield chunk
+            if proc.wait(timeout=settings.TTS_TIMEOUT) != 0:
+                raise RuntimeError(f"espeak exited with status {proc.returncode}")
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+    @staticmethod
+    def _binary() -> str:
+        binary = settings.ESPEAK_BINARY or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not binary:
+            raise RuntimeError("espeak-ng/espeak not found (install it or set ESPEAK_BINARY)")
+        return binary
+
+
+class Pyttsx3Provider(TTSProvider):
+    """
+    pyttsx3 over the platform engine (SAPI5, NSSpeechSynthesizer, espeak),
+    offline. Its engine is not thread-safe, so calls are serialized.
+    """
+
+    name = "pyttsx3"
+    extension = "wav"
+    media_type = "audio/wav"
+
+    def __init__(self):
+        self._engine = None
+        self._voices: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, lang: str, path: str):
+        with self._lock:
+            engine = self._get_engine()
+            voice = self._voice_for(engine, lang)
+            if voice:
+                engine.setProperty("voice", voice)
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+
+            self._engine = pyttsx3.init()
+        return self._engine
+
+    def _voice_for(self, engine, lang: str) -> str:
+        if lang not in self._voices:
+            self._voices[lang] = ""
+            for voice in engine.getProperty("voices"):
+                languages = [
+                    code.decode(errors="ignore") if isinstance(code, bytes) else str(code)
+                    for code in (getattr(voice, "languages", None) or [])
+                ]
+                if any(lang in code for code in languages) or lang in voice.id.lower():
+                    self._voices[lang] = voice.id
+                    break
+        return self._voices[lang]
+
+
+PROVIDERS = {
+    GTTSProvider.name: GTTSProvider,
+    EspeakProvider.name: EspeakProvider,
+    Pyttsx3Provider.name: Pyttsx3Provider,
+}
+
+
+def create_provider(name: str | None = None) -> TTSProvider:
+    """
+    Instantiate the configured (or given) TTS provider.
+    """
+    name = (name or settings.TTS_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown TTS provider '{name}', expected one of {sorted(PROVIDERS)}")
+    logger.info(f"TTS provider: {name}")
+    return PROVIDERS[name]()
@@ -1,32 +1,357 @@
+import argparse
+import asyncio
+import hashlib
 import os
-import uuid
-from gtts import gTTS
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from loguru import logger
 from app.config import get_settings
+from app.services.tts_providers import create_provider
 
 settings = get_settings()
 
+AUDIO_URL_PREFIX = "/static/audio"
+AUDIO_EXTENSIONS = (".mp3", ".wav")
 
-def generate_tts(text: str) -> str:
+# Spoken after every prediction (see /predict), so pre-generated per label
+DISPOSAL_INSTRUCTION = "Dispose in the {label} recycling bin."
+
+
+def disposal_instruction(label: str) -> str:
+    return DISPOSAL_INSTRUCTION.format(label=label)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for the cache key: NFKC and collapsed whitespace.
+    Case is kept, since it can change the speech (acronyms, case-sensitive
+    providers).
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class TTSCache:
+    """
+    Content-addressed store of synthesized audio in `audio_dir`. A file is
+    named by the SHA-256 of (normalized text, language, provider), so the same
+    sentence is synthesized once and then served as a static file. Files not
+    used for `max_age` seconds, and the least recently used ones beyond
+    `max_bytes`, are evicted after writes.
+    """
+
+    AGE_SWEEP_INTERVAL = 3600
+
+    def __init__(self, audio_dir: str, max_bytes: int, max_age: float):
+        self.audio_dir = audio_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._last_sweep = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+
+    @staticmethod
+    def key(text: str, lang: str, provider: str) -> str:
+        return hashlib.sha256(f"{provider}\0{lang}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def path(self, key: str, extension: str) -> str:
+        return os.path.join(self.audio_dir, f"{key}.{extension}")
+
+    def lookup(self, key: str, extension: str) -> bool:
+        """
+        Whether audio for `key` exists; a hit refreshes its age.
+        """
+        try:
+            os.utime(self.path(key, extension))
+            hit = True
+        except OSError:
+            hit = False
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+        return hit
+
+    def added(self, size: int):
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+        self.evict()
+
+    def evict(self, force: bool = False):
+        now = time.time()
+        with self._lock:
+            known = self._disk_bytes
+            sweep_age = self.max_age > 0 and (force or now - self._last_sweep >= self.AGE_SWEEP_INTERVAL)
+        over_size = self.max_bytes > 0 and (known is None or known > self.max_bytes)
+        if not (force or sweep_age or over_size):
+            return
+
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        # Trim to 90% so size eviction does not run on every write
+        target = int(self.max_bytes * 0.9) if 0 < self.max_bytes < total else total
+        evicted = 0
+        for mtime, size, path in sorted(files):
+            expired = self.max_age > 0 and now - mtime > self.max_age
+            if not (expired or total > target):
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+            self._evicted += evicted
+            if sweep_age:
+                self._last_sweep = now
+        if evicted:
+            logger.info(f"Evicted {evicted} cached TTS files ({total} bytes kept)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "audio_dir": self.audio_dir,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evicted": self._evicted,
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _scan(self):
+        files = []
+        try:
+            names = os.listdir(self.audio_dir)
+        except OSError:
+            return files
+        for name in names:
+            if name.endswith(AUDIO_EXTENSIONS):
+                path = os.path.join(self.audio_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+
+cache = TTSCache(
+    settings.TTS_AUDIO_DIR,
+    max_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024,
+    max_age=settings.TTS_CACHE_MAX_AGE_DAYS * 86400,
+)
+
+
+provider = create_provider()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Synthesis blocks (network for gTTS, CPU for the local engines)
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, settings.TTS_WORKERS), thread_name_prefix="tts")
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _temp_path(file_path: str) -> str:
+    """
+    A fresh temp file next to `file_path`. Streams are stepped on whichever
+    pool thread is free, so the name cannot be derived from the thread.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix=f"{os.path.basename(file_path)}.", suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def _url(key: str) -> str:
+    return f"{AUDIO_URL_PREFIX}/{key}.{provider.extension}"
+
+
+def generate_tts(text: str, lang: str = "en") -> str:
     """
-    Generate speech audio from text using gTTS.
+    Synthesize speech with the configured provider, reusing the cached file
+    for text that was already spoken.
     Returns relative URL to the saved audio file.
     """
-    try:
-        os.makedirs(settings.TTS_AUDIO_DIR, exist_ok=True)
+    key = cache.key(text, lang, provider.name)
+    if cache.lookup(key, provider.extension):
+        return _url(key)
+    return _synthesize(text, lang, key)
+
+
+async def generate_tts_async(text: str, lang: str = "en") -> str:
+    """
+    `generate_tts` on the TTS worker pool; cache hits return without queueing.
+    """
+    key = cache.key(text, lang, provider.name)
+    if cache.lookup(key, provider.extension):
+        return _url(key)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _synthesize, text, lang, key)
 
-        # Unique filename
-        filename = f"{uuid.uuid4().hex}.mp3"
-        file_path = os.path.join(settings.TTS_AUDIO_DIR, filename)
 
-        # Generate speech
-        tts = gTTS(text=text, lang="en")
-        tts.save(file_path)
+def _synthesize(text: str, lang: str, key: str) -> str:
+    """
+    Render `text` into the cache file for `key` (already looked up and missed).
+    """
+    try:
+        os.makedirs(settings.TTS_AUDIO_DIR, exist_ok=True)
+        file_path = cache.path(key, provider.extension)
+        tmp_path = _temp_path(file_path)
+        try:
+            provider.synthesize(_clean(text), lang, tmp_path)
+            # Concurrent misses for the same text write the same content
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
-        logger.info(f"TTS generated: {file_path}")
+        logger.info(f"TTS generated ({provider.name}): {file_path}")
+        cache.added(os.path.getsize(file_path))
 
         # Return relative URL for frontend
-        return f"/static/audio/{filename}"
+        return _url(key)
     except Exception as e:
         logger.error(f"TTS generation failed: {e}")
         raise RuntimeError("TTS generation failed")
+
+
+def _read_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        while chunk := fh.read(settings.TTS_STREAM_CHUNK_BYTES):
+            yield chunk
+
+
+def _stream_and_store(text: str, lang: str, key: str) -> Iterator[bytes]:
+    """
+    Forward the provider's audio stream while writing it to the cache; the
+    file is only kept if the stream completed.
+    """
+    os.makedirs(settings.TTS_AUDIO_DIR, exist_ok=True)
+    file_path = cache.path(key, provider.extension)
+    tmp_path = _temp_path(file_path)
+    completed = False
+    try:
+        with open(tmp_path, "wb") as fh:
+            for chunk in provider.stream(_clean(text), lang):
+                fh.write(chunk)
+                yield chunk
+        os.replace(tmp_path, file_path)
+        completed = True
+        cache.added(os.path.getsize(file_path))
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _close(chunks: Iterator[bytes]):
+    try:
+        chunks.close()
+    except ValueError:
+        # Still running on a worker (client went away mid-chunk); the
+        # generator cleans up when it is collected
+        pass
+
+
+async def stream_tts(text: str, lang: str = "en") -> Tuple[str, AsyncIterator[bytes]]:
+    """
+    (media type, audio chunks) for `text`: the cached file if there is one,
+    otherwise audio forwarded as the provider produces it. Every blocking
+    step runs on the TTS worker pool. The first chunk is produced before
+    returning, so provider failures surface before a response starts.
+    """
+    key = cache.key(text, lang, provider.name)
+    if cache.lookup(key, provider.extension):
+        chunks = _read_file(cache.path(key, provider.extension))
+    else:
+        chunks = _stream_and_store(text, lang, key)
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        first = await loop.run_in_executor(executor, next, chunks, None)
+    except Exception as e:
+        await loop.run_in_executor(executor, _close, chunks)
+        logger.error(f"TTS streaming failed: {e}")
+        raise RuntimeError("TTS generation failed")
+
+    async def iterate() -> AsyncIterator[bytes]:
+        try:
+            chunk = first
+            while chunk is not None:
+                yield chunk
+                chunk = await loop.run_in_executor(executor, next, chunks, None)
+        finally:
+            # Also runs when the client disconnects mid-stream
+            await loop.run_in_executor(executor, _close, chunks)
+
+    return provider.media_type, iterate()
+
+
+def pregenerate(labels: List[str], lang: str = "en") -> Dict[str, str]:
+    """
+    Render the disposal instruction for every label into the cache.
+    """
+    urls = {}
+    for label in labels:
+        urls[label] = generate_tts(disposal_instruction(label), lang)
+    cache.evict(force=True)
+    return urls
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the TTS audio cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pregen_cmd = sub.add_parser("pregenerate", help="render disposal instructions for every model label")
+    pregen_cmd.add_argument("--lang", default="en")
+    pregen_cmd.add_argument("--label", action="append", help="label to render (default: all model labels)")
+    sub.add_parser("evict", help="apply the size/age limits now")
+    args = parser.parse_args(argv)
+
+    if args.command == "evict":
+        cache.evict(force=True)
+        print(cache.stats())
+        return 0
+
+    labels = args.label
+    if not labels:
+        from app.services import yolo_service
+
+        labels = sorted(set(yolo_service.get_model().names.values()))
+    for label, url in pregenerate(labels, args.lang).items():
+        print(f"{label}: {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
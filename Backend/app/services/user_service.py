@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 from app.models.leaderboard import Leaderboard
 from app.models.user import User
 from app.core.security import get_password_hash, verify_password, create_access_token
+from app.services.auth_cache import user_cache
+from app.services.leaderboard_cache import cache as leaderboard_cache
+from app.services.score_buffer import buffer as score_buffer
 from app.schemas.auth import UserCreate, UserResponse, Token
 from app.config import get_settings
 
@@ -47,6 +50,7 @@ class UserService:
             )
             db.add(default_entry)
             db.commit()
+            leaderboard_cache.invalidate()
 
             return self._user_to_response(db_user)
 
@@ -64,11 +68,16 @@ class UserService:
         user = db.query(User).filter(User.id == user_id).first()
         return self._user_to_response(user) if user else None
 
+    def get_all_active_users(self, db: Session) -> list[UserResponse]:
+        users = db.query(User).filter(User.is_active.is_(True)).order_by(User.id).all()
+        return [self._user_to_response(user) for user in users]
+
     def update_user(self, db: Session, user_id: int, user_data: dict) -> UserResponse | None:
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             return None
 
+        old_email = user.email
         for key, value in user_data.items():
             if value is not None:
                 setattr(user, key, value)
@@ -76,6 +85,9 @@ class UserService:
         user.last_active = datetime.utcnow()
         db.commit()
         db.refresh(user)
+        # Tokens carry the email: drop both the old and the new address
+        user_cache.invalidate(user_id=user_id, email=old_email)
+        user_cache.invalidate(email=user.email)
         return self._user_to_response(user)
 
     def delete_user(self, db: Session, user_id: int) -> bool:
@@ -83,8 +95,15 @@ class UserService:
         if not user:
             return False
 
+        email = user.email
+        # The leaderboard row references the user; buffered points would
+        # otherwise recreate it on the next flush
+        score_buffer.discard(user_id)
+        db.query(Leaderboard).filter(Leaderboard.user_id == user_id).delete(synchronize_session=False)
         db.delete(user)
         db.commit()
+        user_cache.invalidate(user_id=user_id, email=email)
+        leaderboard_cache.invalidate()
         return True
 
     def create_access_token_for_user(self, user: User) -> Token:
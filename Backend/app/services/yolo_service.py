@@ -1,53 +1,227 @@
+import math
 import os
-from typing import Dict, Any, List
-from ultralytics import YOLO
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from queue import Queue, Empty
+from statistics import NormalDist
+from typing import Dict, Any, List, Tuple, Union
+import numpy as np
 from app.config import get_settings
 from loguru import logger
-from app.utils.video_utils import extract_frames
+from app.services.inference_backends import create_backend, weights_path_for
+from app.services.near_duplicate import index as near_duplicates
+from app.utils.buffer_pool import frame_pool
+from app.utils.file_utils import decode_image
+from app.utils.video_utils import iter_frames
 
 settings = get_settings()
 
-# Load YOLO model at service startup
-try:
-    logger.info(f"Loading YOLO model from {settings.YOLO_MODEL_PATH}")
-    model = YOLO(settings.YOLO_MODEL_PATH)
-except Exception as e:
-    logger.error(f"Failed to load YOLO model: {e}")
-    model = None
+# YOLO model is loaded lazily on first use, or by the startup warm-up
+# (backend chosen by YOLO_BACKEND), so importing this module stays cheap.
+model = None
+_load_error: str | None = None
+_load_lock = threading.Lock()
 
+# ultralytics predictors are not thread-safe; one forward pass at a time
+_model_lock = threading.Lock()
 
-def predict_image(image_path: str) -> Dict[str, Any]:
+
+def load_model():
     """
-    Run YOLOv12 inference on a single image.
-    Returns top label, confidence, and bounding box list.
+    Load the YOLO model once (thread-safe).
+    Returns the model, or None if loading failed.
     """
-    if model is None:
+    global model, _load_error
+    if model is not None:
+        return model
+    with _load_lock:
+        if model is None and _load_error is None:
+            started = time.perf_counter()
+            try:
+                model = create_backend()
+                logger.info(f"YOLO model loaded in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"Failed to load YOLO model: {e}")
+                _load_error = str(e)
+    return model
+
+
+def get_model():
+    loaded = load_model()
+    if loaded is None:
         raise RuntimeError("YOLO model not loaded")
+    return loaded
 
-    results = model.predict(
-        source=image_path,
-        conf=settings.YOLO_CONFIDENCE_THRESHOLD,
-        iou=settings.YOLO_IOU_THRESHOLD,
-        verbose=False,
-    )
 
-    if not results:
-        return {"label": "unknown", "confidence": 0.0, "bboxes": []}
+def model_status() -> Dict[str, Any]:
+    return {"loaded": model is not None, "error": _load_error}
+
+
+def model_version() -> str:
+    """
+    Human-readable identifier of the served weights (backend, file name and
+    modification time), recorded with every logged prediction.
+    """
+    path = weights_path_for(settings.YOLO_BACKEND)
+    version = f"{settings.YOLO_BACKEND}:{os.path.basename(os.path.normpath(path))}"
+    try:
+        version += f"@{datetime.fromtimestamp(os.stat(path).st_mtime, timezone.utc):%Y%m%dT%H%M%SZ}"
+    except OSError:
+        pass
+    return version[:64]
+
+
+def model_fingerprint() -> str:
+    """
+    Identify the loaded weights and thresholds, for keying cached predictions.
+    """
+    path = weights_path_for(settings.YOLO_BACKEND)
+    try:
+        st = os.stat(path)
+        version = f"{os.path.basename(path)}:{st.st_size}:{int(st.st_mtime)}"
+    except OSError:
+        version = os.path.basename(path)
+    return f"{settings.YOLO_BACKEND}:{version}|conf={settings.YOLO_CONFIDENCE_THRESHOLD}|iou={settings.YOLO_IOU_THRESHOLD}"
+
+
+class BatchingEngine:
+    """
+    Collects concurrent predict_image calls into micro-batches.
+    A single worker thread waits up to `max_wait_ms` for more requests
+    (or until `max_batch_size` is reached), runs one forward pass for the
+    whole batch and hands each caller its own result through a Future.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "Queue[Tuple[Any, Future]]" = Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._batches = 0
+        self._requests = 0
+        self._largest_batch = 0
+        self._batch_sizes: Dict[int, int] = {}
+
+    def submit(self, source: Any) -> Future:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((source, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="yolo-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=remaining))
+                except Empty:
+                    break
+            self._dispatch(batch)
 
-    result = results[0]
+    def _dispatch(self, batch: List[Tuple[Any, Future]]):
+        batch = [(source, future) for source, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
 
+        try:
+            outputs = _run_model([source for source, _ in batch])
+        except Exception as e:
+            logger.error(f"Batched YOLO inference failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            size = len(batch)
+            self._batches += 1
+            self._requests += size
+            self._largest_batch = max(self._largest_batch, size)
+            self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+
+batcher = BatchingEngine(settings.YOLO_BATCH_MAX_SIZE, settings.YOLO_BATCH_MAX_WAIT_MS)
+
+
+_first_inference_logged = False
+
+
+def _run_model(sources: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Run one forward pass over `sources` and parse every result.
+    """
+    global _first_inference_logged
+    loaded = get_model()
+    started = time.perf_counter()
+    with _model_lock:
+        results = loaded.predict(
+            source=sources,
+            imgsz=settings.YOLO_IMGSZ,
+            conf=settings.YOLO_CONFIDENCE_THRESHOLD,
+            iou=settings.YOLO_IOU_THRESHOLD,
+            verbose=False,
+        )
+    if not _first_inference_logged:
+        _first_inference_logged = True
+        logger.info(
+            f"First request inference took {(time.perf_counter() - started) * 1000:.1f}ms "
+            f"(batch of {len(sources)})"
+        )
+    results = list(results or [])
+    if len(results) != len(sources):
+        raise RuntimeError(f"YOLO returned {len(results)} results for {len(sources)} inputs")
+    return [_parse_result(result, loaded.names) for result in results]
+
+
+def _parse_result(result, names: Dict[int, str]) -> Dict[str, Any]:
+    """
+    Convert a single ultralytics result into label, confidence and bbox list.
+    """
     # Extract best prediction (highest confidence)
     if len(result.boxes) == 0:
         return {"label": "unknown", "confidence": 0.0, "bboxes": []}
 
     best_box = result.boxes[0]
-    label = model.names[int(best_box.cls[0])]
+    label = names[int(best_box.cls[0])]
     confidence = float(best_box.conf[0])
 
     bboxes: List[Dict[str, Any]] = []
     for box in result.boxes:
         bboxes.append({
-            "label": model.names[int(box.cls[0])],
+            "label": names[int(box.cls[0])],
             "confidence": float(box.conf[0]),
             "bbox": box.xyxy[0].tolist(),  # [x1, y1, x2, y2]
         })
@@ -59,35 +233,244 @@ def predict_image(image_path: str) -> Dict[str, Any]:
     }
 
 
-def predict_video(video_path: str, frame_interval: int = 30) -> Dict[str, Any]:
+def _warmup_shapes() -> List[Tuple[int, int, int]]:
+    """
+    Parse YOLO_WARMUP_SHAPES ("640x480,1280x720", width x height).
+    """
+    shapes = []
+    for item in settings.YOLO_WARMUP_SHAPES.split(","):
+        try:
+            width, height = (int(v) for v in item.lower().strip().split("x"))
+            shapes.append((height, width, 3))
+        except ValueError:
+            if item.strip():
+                logger.warning(f"Ignoring invalid warm-up shape '{item}'")
+    return shapes
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Run dummy batches at each configured input shape so kernel selection,
+    allocation and layer fusion happen before the first real request.
+    Also pre-allocates pooled frame buffers for those shapes.
+    Returns milliseconds per warm-up pass, keyed by "WxH@batch".
+    """
+    loaded = get_model()
+    batch_sizes = sorted({1, max(1, settings.YOLO_BATCH_MAX_SIZE), max(1, settings.YOLO_VIDEO_BATCH_SIZE)})
+    timings: Dict[str, float] = {}
+
+    for shape in _warmup_shapes():
+        frame_pool.preallocate(shape, max(batch_sizes))
+        for batch_size in batch_sizes:
+            images = [frame_pool.acquire(shape) for _ in range(batch_size)]
+            for image in images:
+                image.fill(114)
+            started = time.perf_counter()
+            try:
+                with _model_lock:
+                    loaded.predict(
+                        source=images,
+                        imgsz=settings.YOLO_IMGSZ,
+                        conf=settings.YOLO_CONFIDENCE_THRESHOLD,
+                        iou=settings.YOLO_IOU_THRESHOLD,
+                        verbose=False,
+                    )
+            finally:
+                for image in images:
+                    frame_pool.release(image)
+            timings[f"{shape[1]}x{shape[0]}@{batch_size}"] = (time.perf_counter() - started) * 1000
+
+    logger.info(
+        f"YOLO warm-up ran {len(timings)} passes in {sum(timings.values()):.0f}ms: "
+        + ", ".join(f"{key}={ms:.0f}ms" for key, ms in timings.items())
+    )
+    return timings
+
+
+def get_batching_stats() -> Dict[str, Any]:
+    """
+    Queue depth and batch-size statistics of the batching engine.
+    """
+    return {"enabled": settings.YOLO_BATCHING_ENABLED, **batcher.stats(), "frame_pool": frame_pool.stats()}
+
+
+def get_near_duplicate_stats() -> Dict[str, Any]:
+    """
+    Threshold and hit rate of the near-duplicate index in this process.
+    """
+    return near_duplicates.stats()
+
+
+def predict_image(image: Union[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Run YOLOv12 inference on a single image (file path or BGR array).
+    Returns top label, confidence, and bounding box list.
+    Concurrent calls are grouped into one forward pass when batching is enabled.
+    """
+    get_model()
+
+    if settings.YOLO_BATCHING_ENABLED:
+        return batcher.submit(image).result()
+
+    return _run_model([image])[0]
+
+
+def predict_image_bytes(data: bytes) -> Dict[str, Any]:
+    """
+    Decode uploaded image bytes in memory and run inference, without
+    writing the upload to disk first.
+    With NEAR_DUP_ENABLED, a result for a perceptually near-identical image
+    seen earlier is returned instead of running the model.
+    """
+    image = decode_image(data)
+    if not near_duplicates.enabled:
+        return predict_image(image)
+
+    phash, result = near_duplicates.lookup(image)
+    if result is None:
+        result = predict_image(image)
+        near_duplicates.add(phash, result)
+    return result
+
+
+def _predict_batch(images: List[np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Run inference on several in-memory images, sharing the batching engine
+    with concurrent image requests when it is enabled.
+    """
+    if settings.YOLO_BATCHING_ENABLED:
+        futures = [batcher.submit(image) for image in images]
+        return [future.result() for future in futures]
+    return _run_model(images)
+
+
+def _consensus_reached(label_counts: Dict[str, int], labelled: int) -> bool:
+    """
+    True when the leading label holds a majority whose one-sided Wilson lower
+    bound (at VIDEO_CONSENSUS_CONFIDENCE) exceeds 0.5 + VIDEO_CONSENSUS_MARGIN.
+    """
+    if labelled < max(1, settings.VIDEO_MIN_FRAMES):
+        return False
+    z = NormalDist().inv_cdf(settings.VIDEO_CONSENSUS_CONFIDENCE)
+    share = max(label_counts.values()) / labelled
+    denominator = 1 + z * z / labelled
+    centre = share + z * z / (2 * labelled)
+    spread = z * math.sqrt(share * (1 - share) / labelled + z * z / (4 * labelled * labelled))
+    lower_bound = (centre - spread) / denominator
+    return lower_bound > 0.5 + settings.VIDEO_CONSENSUS_MARGIN
+
+
+def _aggregate_track(frames: List[Dict[str, Any]], label: str) -> List[Dict[str, Any]]:
+    """
+    Best box of `label` in every analysed frame, in frame order.
+    """
+    track = []
+    for frame in frames:
+        boxes = [b for b in frame["bboxes"] if b["label"] == label]
+        if boxes:
+            best = max(boxes, key=lambda b: b["confidence"])
+            track.append({
+                "frame_index": frame["frame_index"],
+                "confidence": best["confidence"],
+                "bbox": best["bbox"],
+            })
+    return track
+
+
+def predict_video(
+    video_path: str,
+    frame_interval: int = 30,
+    adaptive: bool | None = None,
+    detail: bool = False,
+) -> Dict[str, Any]:
     """
     Run YOLO inference on a video by sampling frames.
-    Returns majority label across frames and average confidence.
+    Sampled frames are decoded in memory and sent to the model in batches.
+    In adaptive mode sampling stops as soon as the leading label has a
+    statistically stable majority, or when VIDEO_TIME_BUDGET_S runs out.
+    Returns majority label across frames and average confidence; with
+    `detail`, also per-frame detections and the bbox track of that label.
     """
-    frames = extract_frames(video_path, interval=frame_interval)
-    if not frames:
-        return {"label": "unknown", "confidence": 0.0, "bboxes": []}
+    get_model()
+    if adaptive is None:
+        adaptive = settings.VIDEO_ADAPTIVE
 
-    label_counts = {}
+    started = time.monotonic()
+    label_counts: Dict[str, int] = {}
+    frames: List[Dict[str, Any]] = []
     total_conf = 0.0
     total_preds = 0
+    stop_reason = "end_of_video"
+    # Small steps in adaptive mode so the consensus check can fire early
+    batch_size = max(1, settings.VIDEO_MIN_FRAMES if adaptive else settings.YOLO_VIDEO_BATCH_SIZE)
+    batch: List[Tuple[int, np.ndarray]] = []
 
-    for frame in frames:
-        res = predict_image(frame)
-        if res["label"] != "unknown":
-            label_counts[res["label"]] = label_counts.get(res["label"], 0) + 1
-            total_conf += res["confidence"]
-            total_preds += 1
+    def consume(items: List[Tuple[int, np.ndarray]]):
+        nonlocal total_conf, total_preds
+        try:
+            outputs = _predict_batch([frame for _, frame in items])
+        finally:
+            for _, frame in items:
+                frame_pool.release(frame)
+        for (index, _), res in zip(items, outputs):
+            frames.append({"frame_index": index, **res})
+            if res["label"] != "unknown":
+                label_counts[res["label"]] = label_counts.get(res["label"], 0) + 1
+                total_conf += res["confidence"]
+                total_preds += 1
+
+    def should_stop() -> bool:
+        nonlocal stop_reason
+        if not adaptive:
+            return False
+        if label_counts and _consensus_reached(label_counts, total_preds):
+            stop_reason = "consensus"
+            return True
+        budget = settings.VIDEO_TIME_BUDGET_S
+        if budget > 0 and time.monotonic() - started >= budget:
+            stop_reason = "time_budget"
+            return True
+        return False
+
+    for item in iter_frames(video_path, interval=frame_interval, pool=frame_pool):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            consume(batch)
+            batch = []
+            if should_stop():
+                break
+    else:
+        if batch:
+            consume(batch)
+
+    summary = {
+        "frames_analyzed": len(frames),
+        "stop_reason": stop_reason,
+    }
+    if detail:
+        summary["frames"] = frames
 
     if total_preds == 0:
-        return {"label": "unknown", "confidence": 0.0, "bboxes": []}
+        return {"label": "unknown", "confidence": 0.0, "bboxes": [], **summary}
 
     # Most frequent label across frames
     final_label = max(label_counts, key=label_counts.get)
     avg_conf = total_conf / total_preds
 
+    bboxes: List[Dict[str, Any]] = []
+    if detail:
+        track = _aggregate_track(frames, final_label)
+        summary["track"] = track
+        if track:
+            bboxes.append({
+                "label": final_label,
+                "confidence": sum(t["confidence"] for t in track) / len(track),
+                "bbox": [sum(t["bbox"][i] for t in track) / len(track) for i in range(4)],
+            })
+
     return {
         "label": final_label,
         "confidence": avg_conf,
-        "bboxes": [],  # Could be extended with aggregated detections
+        "bboxes": bboxes,
+        **summary,
     }
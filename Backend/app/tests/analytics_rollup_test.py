@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database.session import Base
+from app.models import Feedback, FeedbackRollup
+from app.schemas.feedback import FeedbackRequest
+from app.services import feedback_service
+from app.services.analytics_services import bucket_start, rebuild_rollups
+
+
+@pytest.fixture
+def databases(tmp_path):
+    url = f"sqlite:///{tmp_path / 'analytics.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    yield sessionmaker(bind=engine), async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def rollups(SyncSession):
+    with SyncSession() as db:
+        return sorted(
+            tuple(row)
+            for row in db.execute(select(
+                FeedbackRollup.granularity,
+                FeedbackRollup.bucket_start,
+                FeedbackRollup.predicted_label,
+                FeedbackRollup.correct_label,
+                FeedbackRollup.count,
+            ))
+        )
+
+
+def test_live_rollups_match_a_rebuild(databases, monkeypatch):
+    SyncSession, AsyncSession = databases
+    # Just before midnight UTC: a second clock would land in another day
+    moment = datetime(2026, 3, 1, 23, 59, 59, 900000)
+    monkeypatch.setattr(feedback_service, "utcnow", lambda: moment)
+
+    async def write():
+        async with AsyncSession() as db:
+            await feedback_service.save_feedback(
+                db, FeedbackRequest(user_id="1", predicted_label="plastic", correct_label="glass")
+            )
+            await feedback_service.save_feedback_bulk(db, [
+                FeedbackRequest(user_id="2", predicted_label="paper", correct_label="paper"),
+                FeedbackRequest(user_id="3", predicted_label="plastic", correct_label="glass"),
+            ])
+    asyncio.run(write())
+
+    with SyncSession() as db:
+        assert {row.created_at.replace(tzinfo=None) for row in db.scalars(select(Feedback))} == {moment}
+    live = rollups(SyncSession)
+    assert {row[1] for row in live} == {bucket_start(moment, "hour"), bucket_start(moment, "day")}
+    assert ("day", datetime(2026, 3, 1), "plastic", "glass", 2) in live
+
+    with SyncSession() as db:
+        rebuild_rollups(db)
+    assert rollups(SyncSession) == live
@@ -0,0 +1,53 @@
+import time
+from app.schemas.auth import UserResponse
+from app.services.auth_cache import TokenCache, UserCache
+
+
+def user(user_id=1, email="a@x.io"):
+    return UserResponse(id=user_id, username="u", email=email)
+
+
+def test_token_cache_serves_until_exp_only():
+    cache = TokenCache(max_entries=10)
+    cache.put("live", {"sub": "a@x.io", "exp": time.time() + 60})
+    cache.put("no-exp", {"sub": "a@x.io"})
+    cache.put("expired", {"sub": "a@x.io", "exp": time.time() - 1})
+
+    assert cache.get("live")["sub"] == "a@x.io"
+    assert cache.get("no-exp") is None
+    assert cache.get("expired") is None
+
+
+def test_token_cache_is_bounded_lru():
+    cache = TokenCache(max_entries=2)
+    exp = time.time() + 60
+    for token in ("t1", "t2"):
+        cache.put(token, {"exp": exp})
+    cache.get("t1")
+    cache.put("t3", {"exp": exp})
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None and cache.get("t3") is not None
+
+
+def test_user_cache_invalidates_by_id_and_email():
+    cache = UserCache(ttl=60, max_entries=10)
+    cache.put(user(1, "a@x.io"))
+    cache.put(user(2, "b@x.io"))
+
+    cache.invalidate(user_id=1)
+    cache.invalidate(email="b@x.io")
+
+    assert cache.get("a@x.io") is None
+    assert cache.get("b@x.io") is None
+
+
+def test_user_cache_entries_expire(monkeypatch):
+    cache = UserCache(ttl=5, max_entries=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put(user())
+    assert cache.get("a@x.io") is not None
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("a@x.io") is None
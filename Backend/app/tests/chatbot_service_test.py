@@ -0,0 +1,60 @@
+import asyncio
+from app.services.chatbot_service import ERROR_REPLY, ChatbotService, normalize_question
+
+
+class CountingProvider:
+    name = "counting"
+    available = True
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def generate(self, message):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return f"answer {self.calls}"
+
+
+def service(provider, timeout=1.0, cache_ttl=60.0):
+    return ChatbotService(provider, timeout=timeout, max_concurrency=2, cache_ttl=cache_ttl, cache_size=10)
+
+
+def test_normalize_question_drops_case_punctuation_and_filler():
+    assert normalize_question("Is a Pizza box recyclable??") == normalize_question("is pizza box recyclable")
+
+
+def test_identical_questions_in_flight_share_one_call():
+    provider = CountingProvider(delay=0.05)
+    chatbot = service(provider)
+
+    async def run():
+        return await asyncio.gather(*(chatbot.reply("Is glass recyclable?") for _ in range(5)))
+
+    answers = asyncio.run(run())
+    assert provider.calls == 1
+    assert set(answers) == {"answer 1"}
+    assert chatbot.stats()["coalesced"] == 4
+
+
+def test_answers_are_cached_but_failures_are_not():
+    provider = CountingProvider()
+    chatbot = service(provider)
+    assert asyncio.run(chatbot.reply("glass?")) == "answer 1"
+    assert asyncio.run(chatbot.reply("Glass")) == "answer 1"
+    assert provider.calls == 1
+
+    failing = CountingProvider(fail=True)
+    chatbot = service(failing)
+    assert asyncio.run(chatbot.reply("glass?")) == ERROR_REPLY
+    assert asyncio.run(chatbot.reply("glass?")) == ERROR_REPLY
+    assert failing.calls == 2
+
+
+def test_slow_provider_times_out():
+    chatbot = service(CountingProvider(delay=1.0), timeout=0.05)
+    assert asyncio.run(chatbot.reply("glass?")) == ERROR_REPLY
+    assert chatbot.stats()["timeouts"] == 1
@@ -0,0 +1,6 @@
+import os
+
+# Tests build their own in-memory databases; keep the app's engines on
+# SQLite so importing app modules needs no MySQL driver or server
+os.environ["DB_USER"] = ""
+os.environ["LEADERBOARD_CACHE_BACKEND"] = "memory"
@@ -0,0 +1,39 @@
+import pytest
+from app.services import inference_backends
+from app.services.inference_backends import weights_path_for
+
+
+@pytest.fixture
+def model_settings(monkeypatch):
+    settings = inference_backends.settings
+    monkeypatch.setattr(settings, "YOLO_MODEL_PATH", "/models/best_model.pt")
+    monkeypatch.setattr(settings, "YOLO_ONNX_PATH", "")
+    monkeypatch.setattr(settings, "YOLO_OPENVINO_PATH", "")
+    monkeypatch.setattr(settings, "YOLO_INT8", False)
+    return settings
+
+
+def test_default_paths_follow_yolo_int8(model_settings):
+    assert weights_path_for("onnx") == "/models/best_model.onnx"
+    assert weights_path_for("openvino") == "/models/best_model_openvino_model"
+    model_settings.YOLO_INT8 = True
+    assert weights_path_for("onnx") == "/models/best_model.int8.onnx"
+    assert weights_path_for("openvino") == "/models/best_model_int8_openvino_model"
+
+
+def test_explicit_int8_never_targets_the_fp32_weights(model_settings):
+    assert weights_path_for("onnx", int8=True) == "/models/best_model.int8.onnx"
+    assert weights_path_for("openvino", int8=True) == "/models/best_model_int8_openvino_model"
+    model_settings.YOLO_INT8 = True
+    assert weights_path_for("onnx", int8=False) == "/models/best_model.onnx"
+
+
+def test_explicit_path_only_applies_to_the_configured_precision(model_settings):
+    model_settings.YOLO_ONNX_PATH = "/srv/model.onnx"
+    assert weights_path_for("onnx") == "/srv/model.onnx"
+    assert weights_path_for("onnx", int8=False) == "/srv/model.onnx"
+    assert weights_path_for("onnx", int8=True) == "/models/best_model.int8.onnx"
+
+
+def test_torch_uses_model_path(model_settings):
+    assert weights_path_for("torch", int8=True) == "/models/best_model.pt"
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import pytest
+from app.services import inference_executor as module
+from app.services.inference_executor import InferenceExecutor, InferenceSaturatedError
+
+
+def test_rejects_beyond_workers_plus_queue():
+    executor = InferenceExecutor("thread", workers=1, max_queue=1, retry_after=3)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        second = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceSaturatedError) as info:
+            await executor.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(first, second)
+        return info.value.retry_after
+
+    try:
+        assert asyncio.run(scenario()) == 3
+        stats = executor.stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["in_flight"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_thread_warm_up_loads_the_model_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(module, "_load_worker_model", lambda: calls.append(1) or True)
+    executor = InferenceExecutor("thread", workers=4, max_queue=0, retry_after=1)
+    try:
+        assert executor.warm_up() and executor.ready
+        assert calls == [1]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,76 @@
+import time
+from app.services.leaderboard_cache import LeaderboardCache, MemoryBackend
+
+
+def make_cache():
+    return LeaderboardCache(MemoryBackend(max_entries=100), ttl=60)
+
+
+def test_put_then_get_returns_page_and_etag():
+    cache = make_cache()
+    cached, generation = cache.get("page:10:0:")
+    assert cached is None
+
+    etag = cache.put("page:10:0:", {"entries": [1, 2]}, generation)
+
+    cached, _ = cache.get("page:10:0:")
+    assert cached == (etag, {"entries": [1, 2]})
+
+
+def test_invalidate_drops_cached_pages():
+    cache = make_cache()
+    _, generation = cache.get("page")
+    cache.put("page", {"entries": [1]}, generation)
+
+    cache.invalidate()
+
+    cached, _ = cache.get("page")
+    assert cached is None
+
+
+def test_page_computed_across_an_invalidation_is_not_served():
+    cache = make_cache()
+    cached, generation = cache.get("page")
+    assert cached is None
+
+    # A score write lands while the page is being computed
+    cache.invalidate()
+    cache.put("page", {"entries": ["stale"]}, generation)
+
+    cached, _ = cache.get("page")
+    assert cached is None
+
+
+def test_etag_is_stable_for_equal_payloads():
+    assert LeaderboardCache.etag_for({"a": 1, "b": 2}) == LeaderboardCache.etag_for({"b": 2, "a": 1})
+    assert LeaderboardCache.etag_for({"a": 1}) != LeaderboardCache.etag_for({"a": 2})
+
+
+def test_disabled_cache_still_returns_etag():
+    cache = LeaderboardCache(None, ttl=60)
+    cached, generation = cache.get("page")
+    assert cached is None and generation is None
+    assert cache.put("page", {"entries": []}, generation) == LeaderboardCache.etag_for({"entries": []})
+
+
+def test_memory_backend_prunes_expired_entries_on_write(monkeypatch):
+    backend = MemoryBackend(max_entries=100)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    for user_id in range(50):
+        backend.set(f"around:{user_id}:10", "page", ttl=15)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 16)
+    backend.set("page:10:0:", "page", ttl=15)
+
+    assert backend.size() == 1
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_entries=3)
+    for user_id in range(10):
+        backend.set(f"around:{user_id}:10", f"page {user_id}", ttl=60)
+
+    assert backend.size() == 3
+    assert backend.get("around:0:10") is None
+    assert backend.get("around:9:10") == "page 9"
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+from app.services import password_hasher as password_hasher_module
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusyError
+from app.utils import auth_utils
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=0, queue_timeout=5, retry_after=3)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify_round_trip(hasher):
+    async def run():
+        hashed = await hasher.hash("s3cret")
+        return await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_outdated_hash_is_upgraded_on_verify(hasher):
+    params = auth_utils.pwd_context.to_dict()
+    outdated = CryptContext(schemes=["argon2"], argon2__rounds=params["argon2__rounds"] + 1)
+    old_hash = outdated.hash("s3cret")
+
+    valid, new_hash = asyncio.run(hasher.verify_and_update("s3cret", old_hash))
+
+    assert valid and new_hash is not None and new_hash != old_hash
+    assert auth_utils.verify_and_update_password("s3cret", new_hash) == (True, None)
+
+
+def test_full_pool_rejects_with_retry_after(hasher, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(password_hasher_module, "hash_password", lambda password: release.wait(5) and "h")
+
+    async def run():
+        first = asyncio.ensure_future(hasher.hash("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusyError) as busy:
+            await hasher.hash("b")
+        release.set()
+        await first
+        return busy.value
+
+    assert asyncio.run(run()).retry_after == 3
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["in_flight"] == 0
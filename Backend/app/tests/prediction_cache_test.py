@@ -0,0 +1,37 @@
+import os
+from app.services.prediction_cache import PredictionCache
+
+RESULT = {"label": "glass", "confidence": 0.9}
+
+
+def test_memory_tier_is_bounded_lru():
+    cache = PredictionCache("model-a", max_entries=2)
+    for content_hash in ("h1", "h2"):
+        cache.put(content_hash, RESULT)
+    cache.get("h1")
+    cache.put("h3", RESULT)
+
+    assert cache.get("h2") is None
+    assert cache.get("h1") == RESULT and cache.get("h3") == RESULT
+
+
+def test_namespace_change_never_serves_old_results(tmp_path):
+    old = PredictionCache("model-a", max_entries=10, disk_dir=str(tmp_path))
+    _, cached = old.lookup(b"image")
+    assert cached is None
+    content_hash, _ = old.lookup(b"image")
+    old.persist(content_hash, RESULT)
+
+    assert PredictionCache("model-a", max_entries=10, disk_dir=str(tmp_path)).lookup(b"image")[1] == RESULT
+    assert PredictionCache("model-b", max_entries=10, disk_dir=str(tmp_path)).lookup(b"image")[1] is None
+
+
+def test_disk_tier_is_trimmed_to_its_size_limit(tmp_path):
+    cache = PredictionCache("model-a", max_entries=0, disk_dir=str(tmp_path), disk_max_bytes=500)
+    for i in range(40):
+        cache.persist(f"{i:064x}", RESULT)
+
+    sizes = [os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names]
+    assert 0 < sum(sizes) <= 500
+    # The newest entry survives eviction
+    assert cache.get(f"{39:064x}") == RESULT
@@ -0,0 +1,146 @@
+import asyncio
+import glob
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database.session import Base
+from app.models import Leaderboard
+from app.services import gamification_service, score_buffer as score_buffer_module
+from app.services.gamification_service import GamificationService
+from app.services.score_buffer import ScoreBuffer, analysis_points
+
+# (existing row as (score, items) or None, operations)
+SEQUENCES = [
+    # crosses the five-analysis boundary only once the items write counts
+    ((100, 3), [("update", 0, 4), ("analysis",), ("analysis",), ("analysis",)]),
+    (None, [("analysis",)] * 7),
+    (None, [("update", 20, 2)] + [("analysis",)] * 4),
+    ((0, 0), [("update", 5, 1), ("update", 0, 2), ("analysis",), ("analysis",)]),
+]
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'scores.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    monkeypatch.setattr(score_buffer_module, "SessionLocal", sessionmaker(bind=engine))
+    yield sessionmaker(bind=engine), async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def seed(SyncSession, user_id, row):
+    if row is not None:
+        with SyncSession() as db:
+            db.add(Leaderboard(user_id=user_id, score=row[0], items_analyzed=row[1]))
+            db.commit()
+
+
+def stored(SyncSession, user_id):
+    with SyncSession() as db:
+        row = db.execute(select(Leaderboard.score, Leaderboard.items_analyzed).where(Leaderboard.user_id == user_id)).first()
+        return tuple(row) if row is not None else None
+
+
+def apply(AsyncSession, user_id, operations):
+    async def run():
+        async with AsyncSession() as db:
+            service = GamificationService(db)
+            for op in operations:
+                if op[0] == "update":
+                    await service.update_leaderboard(user_id, op[1], op[2])
+                else:
+                    await service.add_analysis_points(user_id)
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("row,operations", SEQUENCES)
+def test_buffered_and_immediate_modes_award_the_same_points(databases, monkeypatch, row, operations):
+    SyncSession, AsyncSession = databases
+
+    monkeypatch.setattr(gamification_service, "score_buffer", ScoreBuffer(False, 60, 1000))
+    seed(SyncSession, 1, row)
+    apply(AsyncSession, 1, operations)
+
+    buffer = ScoreBuffer(True, 60, 1000)
+    monkeypatch.setattr(gamification_service, "score_buffer", buffer)
+    seed(SyncSession, 2, row)
+    apply(AsyncSession, 2, operations)
+    before_flush = buffer.merged(2, *(row or (None, None)))
+    assert buffer.flush() == 1
+
+    assert stored(SyncSession, 2) == stored(SyncSession, 1)
+    assert before_flush == stored(SyncSession, 1)
+
+
+def test_analysis_points():
+    assert analysis_points(0, 1) == 150
+    assert analysis_points(3, 4) == 2 * 150 + 2 * 250
+    assert analysis_points(9, 2) == 500
+
+
+def test_replay_recovers_unflushed_events(databases, tmp_path, monkeypatch):
+    SyncSession, _ = databases
+    log_path = str(tmp_path / "scores.jsonl")
+
+    crashed = ScoreBuffer(True, 60, 1000, log_path=log_path)
+    crashed.start()
+    crashed.add(7, analyses=1)
+    crashed.add(7, score=5, items=2)
+    crashed.add(8, analyses=1)
+    # The database is down when the process stops: nothing gets written
+    monkeypatch.setattr(crashed, "_write", lambda batch: (_ for _ in ()).throw(RuntimeError("db down")))
+    crashed.stop()
+    with open(log_path, "a", encoding="utf-8") as fh:
+        fh.write('{"user_id": 9, "sco')  # torn last line
+
+    recovered = ScoreBuffer(True, 60, 1000, log_path=log_path)
+    recovered.start()
+    assert recovered.merged(7, None, None) == crashed.merged(7, None, None)
+    recovered.stop()
+
+    # items first, then the analysis; the row was created by a write, so no bonus
+    assert stored(SyncSession, 7) == (5 + analysis_points(2, 1), 3)
+    assert stored(SyncSession, 8) == (10 + analysis_points(0, 1), 1)
+    assert not glob.glob(f"{log_path}.*.flushing")
+
+
+def test_replay_drops_events_of_discarded_users(databases, tmp_path, monkeypatch):
+    SyncSession, _ = databases
+    log_path = str(tmp_path / "scores.jsonl")
+
+    crashed = ScoreBuffer(True, 60, 1000, log_path=log_path)
+    crashed.start()
+    crashed.add(7, analyses=1)
+    crashed.add(8, analyses=1)
+    monkeypatch.setattr(crashed, "_write", lambda batch: (_ for _ in ()).throw(RuntimeError("db down")))
+    # Events for 7 now sit in a rotated segment, the tombstone in the live log
+    crashed.flush()
+    crashed.discard(7)
+    assert not crashed.has_pending(7)
+    crashed.stop()
+
+    recovered = ScoreBuffer(True, 60, 1000, log_path=log_path)
+    recovered.start()
+    assert not recovered.has_pending(7)
+    recovered.stop()
+
+    assert stored(SyncSession, 7) is None
+    assert stored(SyncSession, 8) == (10 + analysis_points(0, 1), 1)
+
+
+def test_failed_flush_does_not_restore_discarded_users(databases, monkeypatch):
+    buffer = ScoreBuffer(True, 60, 1000)
+    buffer.add(7, analyses=1)
+
+    def write_while_user_is_deleted(batch):
+        buffer.discard(7)
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(buffer, "_write", write_while_user_is_deleted)
+    buffer.flush()
+
+    assert not buffer.has_pending(7)
@@ -0,0 +1,46 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.security import create_access_token, get_optional_user
+from app.database.session import Base
+from app.models import User
+
+
+@pytest.fixture
+def AsyncSession(tmp_path):
+    url = f"sqlite:///{tmp_path / 'auth.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(id=5, username="u", email="u@x.io", password_hash="x"))
+        db.commit()
+    engine.dispose()
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    yield async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+
+
+def optional_user(AsyncSession, token):
+    async def run():
+        async with AsyncSession() as db:
+            return await get_optional_user(token, db)
+    return asyncio.run(run())
+
+
+def test_optional_user_comes_from_the_token(AsyncSession):
+    token = create_access_token({"sub": "u@x.io"}, expires_delta=timedelta(minutes=5))
+    user = optional_user(AsyncSession, token)
+    assert user.id == 5 and user.email == "u@x.io"
+
+
+@pytest.mark.parametrize("token", [None, "", "not-a-jwt"])
+def test_missing_or_invalid_token_is_anonymous(AsyncSession, token):
+    assert optional_user(AsyncSession, token) is None
+
+
+def test_token_for_unknown_user_is_anonymous(AsyncSession):
+    token = create_access_token({"sub": "gone@x.io"}, expires_delta=timedelta(minutes=5))
+    assert optional_user(AsyncSession, token) is None
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import pytest
+from app.services import tts_service
+from app.services.tts_providers import TTSProvider
+from app.services.tts_service import TTSCache
+
+
+class FakeProvider(TTSProvider):
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text, lang, path):
+        self.calls += 1
+        with open(path, "wb") as fh:
+            fh.write(b"ID3" + text.encode() * 10)
+
+
+@pytest.fixture
+def tts(tmp_path, monkeypatch):
+    provider = FakeProvider()
+    cache = TTSCache(str(tmp_path), max_bytes=0, max_age=0)
+    monkeypatch.setattr(tts_service, "provider", provider)
+    monkeypatch.setattr(tts_service, "cache", cache)
+    monkeypatch.setattr(tts_service.settings, "TTS_AUDIO_DIR", str(tmp_path))
+    return provider, cache
+
+
+def test_same_sentence_is_synthesized_once(tts):
+    provider, cache = tts
+    url = tts_service.generate_tts("Dispose in the glass   recycling bin.")
+
+    assert tts_service.generate_tts(" Dispose in the glass recycling\nbin.") == url
+    assert provider.calls == 1
+    assert url.startswith(tts_service.AUDIO_URL_PREFIX) and url.endswith(".mp3")
+    assert cache.stats()["hits"] == 1
+
+
+def test_async_miss_is_counted_once(tts):
+    provider, cache = tts
+    url = asyncio.run(tts_service.generate_tts_async("glass"))
+
+    assert asyncio.run(tts_service.generate_tts_async("glass")) == url
+    assert provider.calls == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+    tts_service.shutdown()
+
+
+def test_key_depends_on_language_provider_and_case():
+    key = TTSCache.key("hello", "en", "gtts")
+    assert key != TTSCache.key("HELLO", "en", "gtts")
+    assert key != TTSCache.key("hello", "fr", "gtts")
+    assert key != TTSCache.key("hello", "en", "espeak")
+
+
+def test_stream_stores_the_audio_for_later_requests(tts):
+    provider, cache = tts
+
+    async def collect(text):
+        media_type, chunks = await tts_service.stream_tts(text)
+        return media_type, b"".join([chunk async for chunk in chunks])
+
+    media_type, audio = asyncio.run(collect("plastic"))
+    assert media_type == "audio/mpeg" and audio.startswith(b"ID3")
+    assert asyncio.run(collect("plastic "))[1] == audio
+    assert provider.calls == 1
+    tts_service.shutdown()
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250, max_age=0)
+    for i in range(5):
+        path = cache.path(f"k{i}", "mp3")
+        with open(path, "wb") as fh:
+            fh.write(b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.evict(force=True)
+
+    assert sorted(os.listdir(tmp_path)) == ["k3.mp3", "k4.mp3"]
+
+
+class ChunkedProvider(FakeProvider):
+    def stream(self, text, lang):
+        self.calls += 1
+        for i in range(5):
+            yield f"{text}:{i};".encode() * 100
+
+
+def test_concurrent_streams_of_one_text_use_separate_temp_files(tmp_path, monkeypatch):
+    provider = ChunkedProvider()
+    monkeypatch.setattr(tts_service, "provider", provider)
+    monkeypatch.setattr(tts_service, "cache", TTSCache(str(tmp_path), max_bytes=0, max_age=0))
+    monkeypatch.setattr(tts_service.settings, "TTS_AUDIO_DIR", str(tmp_path))
+    # One worker steps both generators, so a thread-derived temp name collides
+    monkeypatch.setattr(tts_service.settings, "TTS_WORKERS", 1)
+    tts_service.shutdown()
+
+    async def collect():
+        _, chunks = await tts_service.stream_tts("same text")
+        return b"".join([chunk async for chunk in chunks])
+
+    async def run():
+        return await asyncio.gather(collect(), collect())
+
+    expected = b"".join(f"same text:{i};".encode() * 100 for i in range(5))
+    try:
+        assert asyncio.run(run()) == [expected, expected]
+    finally:
+        tts_service.shutdown()
+    assert provider.calls == 2
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith(".mp3")
+    with open(tmp_path / files[0], "rb") as fh:
+        assert fh.read() == expected
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.database.session import Base
+from app.database.upsert import upsert
+from app.models import Leaderboard
+from app.services import gamification_service
+from app.services.score_buffer import ScoreBuffer
+
+table = Leaderboard.__table__
+
+
+def increment(new):
+    return [
+        ("score", table.c.score + new.score),
+        ("items_analyzed", table.c.items_analyzed + new.items_analyzed),
+    ]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'upsert.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_upsert_inserts_then_increments(engine):
+    with engine.begin() as conn:
+        for score, items in [(10, 1), (5, 2), (7, 0)]:
+            conn.execute(upsert(
+                engine.dialect, table,
+                {"user_id": 1, "score": score, "items_analyzed": items},
+                ["user_id"], increment,
+            ))
+        rows = conn.execute(select(table.c.user_id, table.c.score, table.c.items_analyzed)).all()
+    assert rows == [(1, 22, 3)]
+
+
+def test_upsert_rejects_unsupported_dialect():
+    from sqlalchemy.dialects import mssql
+
+    with pytest.raises(NotImplementedError):
+        upsert(mssql.dialect(), table, {"user_id": 1}, ["user_id"], increment)
+
+
+def test_concurrent_leaderboard_updates_lose_no_points(engine, monkeypatch):
+    monkeypatch.setattr(gamification_service, "score_buffer", ScoreBuffer(False, 60, 1000))
+    async_engine = create_async_engine(
+        engine.url.set(drivername="sqlite+aiosqlite"),
+        connect_args={"timeout": 30},
+    )
+    Session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def update():
+        async with Session() as db:
+            return await gamification_service.GamificationService(db).update_leaderboard(1, 3, 1)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(update() for _ in range(20)))
+        finally:
+            await async_engine.dispose()
+
+    results = asyncio.run(run())
+
+    with engine.connect() as conn:
+        row = conn.execute(select(table.c.score, table.c.items_analyzed).where(table.c.user_id == 1)).one()
+    assert tuple(row) == (60, 20)
+    # Every writer saw its own increment applied exactly once
+    assert sorted(r["score"] for r in results) == list(range(3, 61, 3))
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.session import Base
+from app.models import Leaderboard, User
+from app.schemas.auth import UserResponse
+from app.services.auth_cache import user_cache
+from app.services.leaderboard_cache import cache as leaderboard_cache
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_user(db, email="old@x.io"):
+    user = User(username="u", email=email, password_hash="x")
+    db.add(user)
+    db.commit()
+    user_cache.put(UserResponse(id=user.id, username=user.username, email=user.email))
+    return user
+
+
+def test_update_user_evicts_old_and_new_email(db):
+    user = add_user(db)
+    # Something cached under the new address before the change
+    user_cache.put(UserResponse(id=999, username="other", email="new@x.io"))
+
+    updated = UserService().update_user(db, user.id, {"email": "new@x.io"})
+
+    assert updated.email == "new@x.io"
+    assert user_cache.get("old@x.io") is None
+    assert user_cache.get("new@x.io") is None
+
+
+
+def test_delete_user_removes_leaderboard_row_and_cached_entries(db):
+    user = add_user(db, "gone@x.io")
+    db.add(Leaderboard(user_id=user.id, score=50, items_analyzed=1))
+    db.commit()
+    _, generation = leaderboard_cache.get("page")
+
+    assert UserService().delete_user(db, user.id)
+
+    assert db.query(User).count() == 0
+    assert db.query(Leaderboard).count() == 0
+    assert user_cache.get("gone@x.io") is None
+    assert leaderboard_cache.get("page")[1] != generation
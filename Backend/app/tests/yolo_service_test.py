@@ -0,0 +1,20 @@
+import os
+from app.services import inference_backends, yolo_service
+
+
+def test_model_version_names_backend_weights_and_mtime(tmp_path, monkeypatch):
+    weights = tmp_path / "best_model.onnx"
+    weights.write_bytes(b"onnx")
+    os.utime(weights, (0, 1_700_000_000))
+    monkeypatch.setattr(yolo_service.settings, "YOLO_BACKEND", "onnx")
+    monkeypatch.setattr(inference_backends.settings, "YOLO_INT8", False)
+    monkeypatch.setattr(inference_backends.settings, "YOLO_ONNX_PATH", str(weights))
+
+    assert yolo_service.model_version() == "onnx:best_model.onnx@20231114T221320Z"
+
+
+def test_model_version_without_weights_file(monkeypatch):
+    monkeypatch.setattr(yolo_service.settings, "YOLO_BACKEND", "torch")
+    monkeypatch.setattr(inference_backends.settings, "YOLO_MODEL_PATH", "/missing/best_model.pt")
+
+    assert yolo_service.model_version() == "torch:best_model.pt"
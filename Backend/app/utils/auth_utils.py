@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.config import get_settings
@@ -9,8 +9,15 @@ settings = get_settings()
 # -----------------------
 # Password hashing context
 # -----------------------
-# Use argon2 instead of bcrypt to support longer passwords and stronger security
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Use argon2 instead of bcrypt to support longer passwords and stronger security.
+# Parameters come from Settings; hashes made with other values "need update".
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 # -----------------------
 # JWT config
@@ -37,6 +44,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; if it matches but the hash uses outdated parameters,
+    also return a fresh hash to store (None otherwise).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 # -----------------------
 # Token helpers
 # -----------------------
@@ -0,0 +1,58 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import numpy as np
+
+Shape = Tuple[int, ...]
+
+
+class FrameBufferPool:
+    """
+    Pool of pre-allocated uint8 frame buffers, keyed by shape.
+    Video decoding writes into a pooled buffer (VideoCapture.retrieve(image=...))
+    instead of allocating a new array per sampled frame; callers release the
+    buffer once inference on it is done.
+    """
+
+    def __init__(self, max_per_shape: int = 32):
+        self.max_per_shape = max_per_shape
+        self._free: Dict[Shape, List[np.ndarray]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._reused = 0
+        self._allocated = 0
+
+    def preallocate(self, shape: Shape, count: int):
+        with self._lock:
+            free = self._free[tuple(shape)]
+            while len(free) < min(count, self.max_per_shape):
+                free.append(np.empty(shape, dtype=np.uint8))
+                self._allocated += 1
+
+    def acquire(self, shape: Shape) -> np.ndarray:
+        with self._lock:
+            free = self._free.get(tuple(shape))
+            if free:
+                self._reused += 1
+                return free.pop()
+            self._allocated += 1
+        return np.empty(shape, dtype=np.uint8)
+
+    def release(self, buffer: np.ndarray):
+        if buffer is None or buffer.dtype != np.uint8:
+            return
+        with self._lock:
+            free = self._free[buffer.shape]
+            if len(free) < self.max_per_shape:
+                free.append(buffer)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "shapes": len(self._free),
+                "free_buffers": sum(len(free) for free in self._free.values()),
+                "allocated": self._allocated,
+                "reused": self._reused,
+            }
+
+
+frame_pool = FrameBufferPool()
@@ -1,5 +1,7 @@
 import os
 import uuid
+import cv2
+import numpy as np
 from fastapi import UploadFile
 
 def save_upload(file: UploadFile, upload_dir: str) -> str:
@@ -8,10 +10,34 @@ def save_upload(file: UploadFile, upload_dir: str) -> str:
     Returns path to saved file.
     """
     ext = os.path.splitext(file.filename)[-1]
-    filename = f"{uuid.uuid4().hex}{ext}"
+    return write_upload(file.file.read(), upload_dir, ext)
+
+
+def write_upload(data: bytes, upload_dir: str, ext: str, name: str | None = None) -> str:
+    """
+    Write raw upload bytes to upload_dir with unique filename.
+    When `name` (e.g. a content hash) is given it is used instead, and an
+    existing file with that name is reused rather than written again.
+    Returns path to saved file.
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    filename = f"{name or uuid.uuid4().hex}{ext}"
     path = os.path.join(upload_dir, filename)
+    if name and os.path.exists(path):
+        return path
 
     with open(path, "wb") as buffer:
-        buffer.write(file.file.read())
+        buffer.write(data)
 
     return path
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """
+    Decode encoded image bytes (jpg/png) into a BGR array, like cv2.imread.
+    Raises ValueError if the bytes are not a readable image.
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Uploaded file is not a valid image")
+    return image
@@ -0,0 +1,9 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """
+    Naive UTC now: the one clock for stored timestamps and analytics buckets
+    (the database's NOW() is server-local on MySQL).
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -1,24 +1,40 @@
 import cv2
-import os
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from app.utils.buffer_pool import FrameBufferPool
 
-def extract_frames(video_path: str, interval: int = 30):
+def iter_frames(
+    video_path: str,
+    interval: int = 30,
+    pool: Optional[FrameBufferPool] = None,
+) -> Iterator[Tuple[int, np.ndarray]]:
     """
-    Extract frames from video every `interval` frames.
-    Returns list of frame file paths.
+    Yield (frame_index, frame) for every `interval`-th frame of a video.
+    Skipped frames are only grabbed (demuxed), never decoded, and nothing
+    is written to disk. With `pool`, frames are decoded into pooled buffers
+    and the caller must release each one when done with it.
     """
-    frames = []
+    interval = max(1, interval)
     vidcap = cv2.VideoCapture(video_path)
+    shape = (
+        int(vidcap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        int(vidcap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        3,
+    )
     count = 0
 
-    while vidcap.isOpened():
-        ret, frame = vidcap.read()
-        if not ret:
-            break
-        if count % interval == 0:
-            frame_path = f"{video_path}_frame_{count}.jpg"
-            cv2.imwrite(frame_path, frame)
-            frames.append(frame_path)
-        count += 1
-
-    vidcap.release()
-    return frames
+    try:
+        while vidcap.isOpened():
+            if not vidcap.grab():
+                break
+            if count % interval == 0:
+                buffer = pool.acquire(shape) if pool is not None and all(shape) else None
+                ret, frame = vidcap.retrieve(image=buffer)
+                if not ret:
+                    if pool is not None:
+                        pool.release(buffer)
+                    break
+                yield count, frame
+            count += 1
+    finally:
+        vidcap.release()
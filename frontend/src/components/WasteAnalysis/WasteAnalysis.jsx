@@ -86,6 +86,10 @@ const WasteAnalysis = () => {
               {
                 method: "POST",
                 body: formData,
+                // Predictions are attributed to the signed-in user by token
+                headers: user?.token
+                  ? { Authorization: `Bearer ${user.token}` }
+                  : undefined,
               }
             );
 
@@ -14,18 +14,29 @@ const normalizeStats = (data) => ({
   weeklyActivity: data.weeklyActivity ?? [0, 0, 0, 0, 0, 0, 0],
 });
 
+// Last leaderboard response, revalidated with its ETag (304 = unchanged)
+let leaderboardCache = { etag: null, entries: [] };
+
 // ✅ Fetch leaderboard
 export const fetchLeaderboard = createAsyncThunk(
   "leaderboard/fetchLeaderboard",
   async () => {
-    const res = await axios.get("http://localhost:8000/api/v1/leaderboard");
-    return res.data.entries.map((entry) => ({
+    const res = await axios.get("http://localhost:8000/api/v1/leaderboard", {
+      headers: leaderboardCache.etag ? { "If-None-Match": leaderboardCache.etag } : {},
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+    if (res.status === 304) {
+      return leaderboardCache.entries;
+    }
+    const entries = res.data.entries.map((entry) => ({
       username: entry.username,
       score: entry.score,
       itemsAnalyzed: entry.items_analyzed,
       rank: entry.rank,
       streak: entry.streak || 0,
     }));
+    leaderboardCache = { etag: res.headers.etag || null, entries };
+    return entries;
   }
 );
 